@@ -0,0 +1,128 @@
+"""
+Нагрузочный тест ASGI-приложения: синхронные и асинхронные
+представления заметок при одновременных запросах.
+
+Запросы подаются прямо в ASGI-приложение из yanote.asgi, как это
+делает uvicorn, но без сети, чтобы измерять только Django.
+
+    python -m benchmarks.asgi_load --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+async def call(application, path, cookie):
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie)],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def load(application, paths, cookie, total, concurrency):
+    """Прогоняет total запросов, не больше concurrency одновременно."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(index):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            status = await call(application, paths[index % len(paths)],
+                                cookie)
+            latencies.append(time.perf_counter() - start)
+            errors += status != 200
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'rps': total / elapsed,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--notes', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from notes.models import Note
+    from yanote.asgi import application
+
+    with test_database():
+        author = get_user_model().objects.create(username='benchmark')
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст ' * 200,
+                 slug=f'note-{index}', author=author)
+            for index in range(args.notes)
+        )
+        client = Client()
+        client.force_login(author)
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session}'.encode()
+
+        details = [f'note/note-{index}/' for index in range(args.notes)]
+        scenarios = (
+            ('list', ['/notes/'], ['/async/notes/']),
+            ('detail', [f'/{path}' for path in details],
+             [f'/async/{path}' for path in details]),
+        )
+        rows = []
+        for name, sync_paths, async_paths in scenarios:
+            for mode, paths in (('sync', sync_paths), ('async', async_paths)):
+                # Прогрев: шаблоны, соединения с БД, пул потоков.
+                asyncio.run(load(application, paths, cookie, 50, 10))
+                result = asyncio.run(load(
+                    application, paths, cookie, args.requests,
+                    args.concurrency,
+                ))
+                rows.append((
+                    name, mode, f"{result['rps']:.0f}",
+                    f"{result['p50']:.1f}", f"{result['p99']:.1f}",
+                    result['errors'],
+                ))
+        print(f'{args.requests} requests, concurrency {args.concurrency}')
+        print_table(
+            ('page', 'views', 'req/s', 'p50 ms', 'p99 ms', 'errors'), rows
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Общая обвязка для бенчмарков: настройка Django и тестовая БД."""
+import os
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup_django():
+    """Настраивает Django так же, как manage.py."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Создаёт на время бенчмарка отдельную тестовую БД."""
+    from django.test.utils import (
+        setup_databases, setup_test_environment, teardown_databases,
+        teardown_test_environment,
+    )
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(result, key):
+    """Записывает в result[key] длительность блока в секундах."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        result[key] = time.perf_counter() - start
+
+
+def print_table(header, rows):
+    """Печатает результаты выровненной таблицей."""
+    widths = [
+        max(len(str(row[index])) for row in [header, *rows])
+        for index in range(len(header))
+    ]
+    for row in [header, *rows]:
+        print('  '.join(
+            str(cell).rjust(width) for cell, width in zip(row, widths)
+        ))
@@ -0,0 +1,75 @@
+"""
+Воспроизводимые наборы данных для бенчмарков: много пользователей,
+у каждого много заметок с русскими заголовками и текстами.
+
+Одно и то же зерно (seed) даёт одни и те же данные, поэтому замеры
+разных коммитов можно сравнивать между собой.
+"""
+import random
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'встреча', 'отчёт', 'идея', 'проект',
+    'черновик', 'задача', 'щука', 'съезд', 'объявление', 'пятница',
+    'молоко', 'хлеб', 'договор', 'звонок', 'письмо', 'отпуск', 'билеты',
+    'ремонт', 'врач', 'книга', 'фильм', 'рецепт', 'пароль', 'адрес',
+)
+TITLE_WORDS = (
+    'Планы', 'Покупки', 'Рабочие', 'Заметки', 'Идеи', 'Вопросы', 'Итоги',
+    'Черновик', 'Список', 'Напоминание', 'Мысли', 'Встреча', 'Поездка',
+)
+
+
+def make_text(rng, words):
+    """Текст из words случайных слов."""
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_title(rng):
+    """Заголовок вида «Планы: встреча пятница»."""
+    return f'{rng.choice(TITLE_WORDS)}: {make_text(rng, rng.randint(1, 4))}'
+
+
+def make_body(rng, words):
+    """Текст из абзацев по 20–60 слов, всего около words слов."""
+    paragraphs = []
+    while words > 0:
+        size = min(words, rng.randint(20, 60))
+        paragraph = make_text(rng, size)
+        paragraphs.append(paragraph[0].upper() + paragraph[1:] + '.')
+        words -= size
+    return '\n\n'.join(paragraphs)
+
+
+def seed_dataset(users, notes_per_user, body_words=200, seed=0,
+                 batch_size=2000):
+    """
+    Создаёт users пользователей по notes_per_user заметок у каждого.
+
+    Заметки пишутся через bulk_create без сигналов: поисковый индекс
+    и версии списков не обновляются. Возвращает список пользователей.
+    """
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+
+    rng = random.Random(seed)
+    authors = get_user_model().objects.bulk_create(
+        get_user_model()(username=f'user-{index}') for index in range(users)
+    )
+    authors = list(get_user_model().objects.filter(
+        username__in=[author.username for author in authors]
+    ).order_by('id'))
+    batch = []
+    for author in authors:
+        for index in range(notes_per_user):
+            batch.append(Note(
+                title=make_title(rng),
+                text=make_body(rng, body_words),
+                slug=f'{author.username}-note-{index}',
+                author=author,
+            ))
+            if len(batch) >= batch_size:
+                Note.objects.bulk_create(batch)
+                batch = []
+    Note.objects.bulk_create(batch)
+    return authors
@@ -0,0 +1,118 @@
+"""
+Одновременные чтение и запись в SQLite: профиль sqlite-plain
+(журнал по умолчанию) против профиля sqlite (WAL и PRAGMA).
+
+Каждый профиль запускается в отдельном процессе с новым файлом БД;
+читатели листают список заметок через ORM, писатели создают заметки.
+
+    python -m benchmarks.db_concurrency --seconds 5 --readers 8 --writers 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import print_table, setup_django
+
+PROFILES = ('sqlite-plain', 'sqlite')
+
+
+def worker(args):
+    """Нагрузка внутри процесса с выбранным профилем БД."""
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import OperationalError, connection
+
+    from notes.models import Note
+
+    call_command('migrate', verbosity=0)
+    author = get_user_model().objects.create(username='benchmark')
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст ' * 100,
+             slug=f'seed-{index}', author=author)
+        for index in range(1000)
+    )
+    connection.close()
+    deadline = time.perf_counter() + args.seconds
+    counters = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+
+    def read():
+        return list(Note.objects.filter(author=author).only(
+            *Note.LIST_FIELDS
+        ).order_by('author', 'id')[:50])
+
+    def write(number=iter(range(10 ** 9))):
+        Note.objects.create(
+            title='Новая', text='Текст ' * 100,
+            slug=f'new-{next(number)}', author=author,
+        )
+
+    def run(operation, counter):
+        while time.perf_counter() < deadline:
+            try:
+                operation()
+                key = counter
+            except OperationalError:
+                key = 'errors'
+            with lock:
+                counters[key] += 1
+        connection.close()
+
+    threads = [
+        threading.Thread(target=run, args=(read, 'reads'))
+        for _ in range(args.readers)
+    ] + [
+        threading.Thread(target=run, args=(write, 'writes'))
+        for _ in range(args.writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps(counters))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return worker(args)
+
+    rows = []
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(
+                os.environ,
+                YANOTE_DB_PROFILE=profile,
+                YANOTE_DB_NAME=os.path.join(directory, 'db.sqlite3'),
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.db_concurrency',
+                 '--worker', *sys.argv[1:]],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+        result = json.loads(output.splitlines()[-1])
+        rows.append((
+            profile,
+            f"{result['reads'] / args.seconds:.0f}",
+            f"{result['writes'] / args.seconds:.0f}",
+            result['errors'],
+        ))
+    print(f'{args.readers} readers, {args.writers} writers, '
+          f'{args.seconds} s')
+    print_table(('profile', 'reads/s', 'writes/s', 'errors'), rows)
+
+
+if __name__ == '__main__':
+    main()
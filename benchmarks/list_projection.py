@@ -0,0 +1,95 @@
+"""
+Сколько байт и памяти уходит на одну страницу списка заметок
+с проекцией колонок и без неё.
+
+    python -m benchmarks.list_projection --notes 10000 --body-kb 50
+"""
+import argparse
+import tracemalloc
+
+from benchmarks.common import print_table, setup_django, test_database
+
+
+def fetched_bytes(queries):
+    """Повторяет SELECT-запросы и считает объём полученных значений."""
+    from django.db import connection
+
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute(query['sql'])
+            for row in cursor.fetchall():
+                total += sum(len(str(value).encode()) for value in row)
+    return total
+
+
+def measure(client, url):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    tracemalloc.start()
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return fetched_bytes(context.captured_queries), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=10000)
+    parser.add_argument('--body-kb', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=None)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.models import Note
+    from notes.views import NotesList
+
+    with test_database():
+        if args.page_size:
+            settings.NOTES_PAGE_SIZE = args.page_size
+        # Однообразные тексты сжались бы в БД почти до нуля.
+        settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 0
+        author = get_user_model().objects.create(username='benchmark')
+        body = 'ж' * (args.body_kb * 1024 // 2)
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}', text=body,
+                slug=f'note-{index}', author=author,
+            )
+            for index in range(args.notes)
+        )
+        client = Client()
+        client.force_login(author)
+        url = reverse('notes:list')
+        client.get(url)
+
+        rows = []
+        projection = NotesList.only_fields
+        for name, only_fields in (('full rows', None),
+                                  ('projection', projection)):
+            NotesList.only_fields = only_fields
+            # Иначе страница берётся из кэша фрагмента и заметки не
+            # читаются вовсе.
+            cache.clear()
+            fetched, peak = measure(client, url)
+            rows.append((
+                name, f'{fetched / 1024:.1f}', f'{peak / 1024:.1f}'
+            ))
+        NotesList.only_fields = projection
+        print(f'{args.notes} notes, {args.body_kb} KB bodies, '
+              f'page size {settings.NOTES_PAGE_SIZE}')
+        print_table(('mode', 'fetched KB', 'peak memory KB'), rows)
+
+
+if __name__ == '__main__':
+    main()
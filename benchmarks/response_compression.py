@@ -0,0 +1,89 @@
+"""
+Сжатие страниц заметок: размер ответа и процессорное время на запрос
+без сжатия, с gzip, br (если установлен brotli) и сокращением HTML.
+
+    python -m benchmarks.response_compression --sizes 1 16 128 --repeat 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+from benchmarks.data import make_body
+
+# Вариант: (Accept-Encoding, MINIFY_HTML).
+MODES = {
+    'identity': ('', False),
+    'minify': ('', True),
+    'gzip': ('gzip', False),
+    'br': ('br', False),
+    'minify+br': ('br', True),
+}
+
+
+def drain(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def measure(author, url, encoding, minify, repeat):
+    from django.conf import settings
+    from django.test import Client
+
+    settings.MINIFY_HTML = minify
+    # Новый клиент заново собирает цепочку middleware.
+    client = Client(HTTP_ACCEPT_ENCODING=encoding)
+    client.force_login(author)
+    size = len(drain(client.get(url)))
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        drain(client.get(url))
+        samples.append(time.process_time() - start)
+    return size, statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=(1, 16, 128),
+        help='размеры текстов заметок в КБ',
+    )
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+
+    from notes.models import Note
+    from yanote.compression import available_encodings
+
+    modes = {
+        name: mode for name, mode in MODES.items()
+        if not mode[0] or mode[0] in available_encodings()
+    }
+    rng = random.Random(0)
+    rows = []
+    with test_database():
+        author = get_user_model().objects.create(username='benchmark')
+        for kb in args.sizes:
+            note = Note.objects.create(
+                title='Заметка', text=make_body(rng, kb * 1024 // 13),
+                slug=f'note-{kb}', author=author,
+            )
+            url = reverse('notes:detail', args=(note.slug,))
+            baseline = None
+            for name, (encoding, minify) in modes.items():
+                size, cpu = measure(author, url, encoding, minify, args.repeat)
+                baseline = baseline or size
+                rows.append((
+                    kb, name, size, f'{size / baseline:.2f}', f'{cpu:.3f}'
+                ))
+    print_table(('text KB', 'mode', 'bytes', 'ratio', 'cpu ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Задержка поиска по обратному индексу в сравнении с перебором
+текстов через icontains (LIKE).
+
+    python -m benchmarks.search --notes 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+from benchmarks.data import make_text
+
+# Редкое слово встречается в одной заметке из RARE_EVERY.
+RARE_WORD = 'квитанция'
+RARE_EVERY = 1000
+
+
+def latency(run, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--words', type=int, default=60)
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+    from notes.search import index_notes, search_notes
+
+    rng = random.Random(0)
+    with test_database():
+        author = get_user_model().objects.create(username='benchmark')
+        start = time.perf_counter()
+        for offset in range(0, args.notes, args.batch_size):
+            count = min(args.batch_size, args.notes - offset)
+            Note.objects.bulk_create(
+                Note(
+                    title=make_text(rng, 3),
+                    text=make_text(rng, args.words) + (
+                        f' {RARE_WORD}'
+                        if (offset + index) % RARE_EVERY == 0 else ''
+                    ),
+                    slug=f'note-{offset + index}', author=author,
+                )
+                for index in range(count)
+            )
+            index_notes(Note.objects.filter(author=author).order_by(
+                '-id'
+            )[:count])
+        print(f'{args.notes} notes indexed in '
+              f'{time.perf_counter() - start:.1f} s')
+
+        # Первая страница результатов, как в представлении поиска.
+        # Частые слова есть почти в каждой заметке: LIKE быстро набирает
+        # страницу, а индексу нужно ранжировать все совпадения. Редкое
+        # слово показывает полный перебор таблицы при LIKE.
+        page = 50
+        rows = []
+        for query in (RARE_WORD, f'{RARE_WORD} щука', 'щука',
+                      'билеты отпуск врач'):
+            words = query.split()
+
+            def scan():
+                queryset = Note.objects.filter(author=author)
+                for word in words:
+                    queryset = queryset.filter(text__icontains=word)
+                return list(queryset.only(*Note.LIST_FIELDS)[:page])
+
+            def indexed():
+                return list(search_notes(author, query)[:page])
+
+            for name, run in (('LIKE scan', scan), ('index', indexed)):
+                median, worst = latency(run, args.repeat)
+                rows.append((query, name, f'{median:.1f}', f'{worst:.1f}'))
+        print_table(('query', 'mode', 'median ms', 'max ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Скорость формирования адресов из кириллических заголовков
+без кэша транслитерации и с прогретым кэшем.
+
+    python -m benchmarks.slug_cache --titles 20000 --unique 500
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_table, setup_django
+
+WORDS = (
+    'заметка', 'список', 'покупок', 'встреча', 'отчёт', 'идея', 'проект',
+    'черновик', 'задача', 'щука', 'съезд', 'объявление', 'пятница',
+)
+
+
+def make_titles(total, unique, seed=0):
+    rng = random.Random(seed)
+    pool = [
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 6)))
+        for _ in range(unique)
+    ]
+    return [rng.choice(pool) for _ in range(total)]
+
+
+def run(make_slug, titles):
+    start = time.perf_counter()
+    for title in titles:
+        make_slug(title)
+    return len(titles) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=20000)
+    parser.add_argument('--unique', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from pytils.translit import slugify
+
+    from notes.slugs import make_slug, slug_cache_info
+
+    titles = make_titles(args.titles, args.unique)
+    uncached = run(slugify, titles)
+    make_slug.cache_clear()
+    cold = run(make_slug, titles)
+    warm = run(make_slug, titles)
+    print_table(
+        ('mode', 'titles/s'),
+        (
+            ('slugify', f'{uncached:.0f}'),
+            ('cache, cold', f'{cold:.0f}'),
+            ('cache, warm', f'{warm:.0f}'),
+        ),
+    )
+    print(slug_cache_info())
+
+
+if __name__ == '__main__':
+    main()
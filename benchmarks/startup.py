@@ -0,0 +1,91 @@
+"""
+Задержка первых запросов после запуска процесса: шаблоны без кэша,
+с кэширующим загрузчиком и с кэшем, прогретым в NotesConfig.ready.
+
+Каждый прогон — новый процесс Python; анонимные страницы главная
+и входа не обращаются к БД.
+
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.common import print_table, setup_django
+
+# Режим: (YANOTE_CACHED_TEMPLATES, YANOTE_WARM_TEMPLATES).
+MODES = {
+    'uncached': ('0', '0'),
+    'cached': ('1', '0'),
+    'cached + warm-up': ('1', '1'),
+}
+PAGES = ('notes:home', 'users:login')
+
+
+def worker():
+    """Запуск Django и первые запросы внутри нового процесса."""
+    result = {}
+    start = time.perf_counter()
+    setup_django()
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    setup_test_environment()
+    client = Client()
+    # Сервер WSGI собирает цепочку middleware при запуске, а не на
+    # первом запросе.
+    client.handler.load_middleware()
+    result['setup'] = time.perf_counter() - start
+    for attempt in ('first', 'second'):
+        for name in PAGES:
+            start = time.perf_counter()
+            client.get(reverse(name))
+            result[f'{attempt} {name}'] = time.perf_counter() - start
+    print(json.dumps(result))
+
+
+def run_mode(cached, warm):
+    env = {
+        **os.environ,
+        'YANOTE_CACHED_TEMPLATES': cached,
+        'YANOTE_WARM_TEMPLATES': warm,
+    }
+    output = subprocess.run(
+        (sys.executable, '-m', 'benchmarks.startup', '--worker'),
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--worker', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker()
+        return
+
+    keys = ['setup'] + [
+        f'{attempt} {name}'
+        for attempt in ('first', 'second') for name in PAGES
+    ]
+    rows = []
+    for mode, (cached, warm) in MODES.items():
+        runs = [run_mode(cached, warm) for _ in range(args.runs)]
+        rows.append([mode] + [
+            f'{statistics.median(run[key] for run in runs) * 1000:.2f}'
+            for key in keys
+        ])
+    print(f'median of {args.runs} processes, ms')
+    print_table(['mode'] + keys, rows)
+
+
+if __name__ == '__main__':
+    main()
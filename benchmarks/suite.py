@@ -0,0 +1,227 @@
+"""
+Основные операции с заметками на большом наборе данных: через тестовый
+клиент Django (весь стек: middleware, представления, шаблоны) и через
+ORM напрямую. Результаты пишутся в JSON, чтобы сравнивать коммиты.
+
+    python -m benchmarks.suite --users 100 --notes-per-user 1000
+    python -m benchmarks.suite --compare benchmarks/results/<commit>.json
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.common import print_table, setup_django, test_database
+from benchmarks.data import make_body, make_title, seed_dataset
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def measure(run, repeat, before=None):
+    """Прогоняет run() repeat раз; before() вызывается вне замера."""
+    samples = []
+    for iteration in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        run(iteration)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'samples': len(samples),
+        'median_ms': statistics.median(samples),
+        'p95_ms': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+        'mean_ms': statistics.fmean(samples),
+        'min_ms': samples[0],
+    }
+
+
+def client_operations(author, notes, deletable, rng):
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    client.force_login(author)
+    # Первые запросы компилируют шаблоны, не учитываем их.
+    for url in (reverse('notes:home'), reverse('notes:list'),
+                reverse('notes:detail', args=(notes[0].slug,))):
+        client.get(url)
+    deletable = iter(deletable)
+
+    def form(iteration):
+        return {
+            'title': make_title(rng),
+            'text': make_body(rng, 200),
+            'slug': f'client-new-{iteration}',
+        }
+
+    def edit(iteration):
+        slug = rng.choice(notes).slug
+        client.post(
+            reverse('notes:edit', args=(slug,)),
+            {**form(iteration), 'slug': slug},
+        )
+
+    return (
+        ('home', lambda i: client.get(reverse('notes:home')), None),
+        ('list', lambda i: client.get(reverse('notes:list')), cache.clear),
+        ('list cached', lambda i: client.get(reverse('notes:list')), None),
+        ('detail', lambda i: client.get(reverse(
+            'notes:detail', args=(rng.choice(notes).slug,)
+        )), None),
+        ('create', lambda i: client.post(reverse('notes:add'), form(i)),
+         None),
+        ('edit', edit, None),
+        ('delete', lambda i: client.post(reverse(
+            'notes:delete', args=(next(deletable).slug,)
+        )), None),
+    )
+
+
+def orm_operations(author, notes, deletable, rng):
+    from django.conf import settings
+
+    from notes.models import Note
+
+    deletable = iter(deletable)
+
+    def edit(iteration):
+        note = Note.objects.get(author=author, slug=rng.choice(notes).slug)
+        note.text = make_body(rng, 200)
+        note.save()
+
+    return (
+        ('list', lambda i: list(
+            Note.objects.filter(author=author).only(*Note.LIST_FIELDS)
+            .order_by('id')[:settings.NOTES_PAGE_SIZE]
+        ), None),
+        ('detail', lambda i: Note.objects.get(
+            author=author, slug=rng.choice(notes).slug
+        ), None),
+        ('create', lambda i: Note.objects.create(
+            title=make_title(rng), text=make_body(rng, 200),
+            slug=f'orm-new-{i}', author=author,
+        ), None),
+        ('edit', edit, None),
+        ('delete', lambda i: Note.objects.get(
+            pk=next(deletable).pk
+        ).delete(), None),
+    )
+
+
+def compare(results, baseline_path):
+    """Добавляет к результатам отношение медиан к прошлому прогону."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    medians = {
+        (row['layer'], row['operation']): row['median_ms']
+        for row in baseline['results']
+    }
+    for row in results:
+        old = medians.get((row['layer'], row['operation']))
+        row['vs_baseline'] = row['median_ms'] / old if old else None
+    return baseline['meta']['commit']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--notes-per-user', type=int, default=1000)
+    parser.add_argument('--body-words', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--output', help='Файл JSON; по умолчанию results/<коммит>.json.'
+    )
+    parser.add_argument('--compare', help='JSON прошлого прогона.')
+    args = parser.parse_args()
+    if args.repeat * 3 > args.notes_per_user:
+        parser.error('--notes-per-user должно быть не меньше 3 * --repeat')
+
+    setup_django()
+    import django
+    from django.db import connection
+
+    from notes.models import Note
+
+    commit = git_commit()
+    results = []
+    with test_database():
+        start = time.perf_counter()
+        authors = seed_dataset(
+            args.users, args.notes_per_user, args.body_words, args.seed
+        )
+        seed_seconds = time.perf_counter() - start
+        rng = random.Random(args.seed)
+        # Измеряем на пользователе из середины таблицы.
+        author = authors[len(authors) // 2]
+        notes = list(Note.objects.filter(author=author).order_by('id'))
+        # Читаем и правим первую треть заметок, удаляем из остальных.
+        third = len(notes) // 3
+        stable = notes[:third]
+        for layer, operations in (
+            ('client', client_operations(
+                author, stable, notes[third:2 * third], rng
+            )),
+            ('orm', orm_operations(author, stable, notes[2 * third:], rng)),
+        ):
+            for operation, run, before in operations:
+                results.append({
+                    'layer': layer,
+                    'operation': operation,
+                    **measure(run, args.repeat, before),
+                })
+        vendor = connection.vendor
+
+    baseline = compare(results, args.compare) if args.compare else None
+    report = {
+        'meta': {
+            'commit': commit,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': vendor,
+            'seed_seconds': seed_seconds,
+            **{key: value for key, value in vars(args).items()
+               if key not in ('output', 'compare')},
+        },
+        'results': results,
+    }
+    output = Path(args.output or RESULTS_DIR / f'{commit}.json')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+    print(f'{args.users} users x {args.notes_per_user} notes, '
+          f'seeded in {seed_seconds:.1f} s, {vendor}, commit {commit}')
+    header = ['layer', 'operation', 'median ms', 'p95 ms']
+    if baseline:
+        header.append(f'vs {baseline}')
+    rows = []
+    for row in results:
+        cells = [row['layer'], row['operation'],
+                 f'{row["median_ms"]:.2f}', f'{row["p95_ms"]:.2f}']
+        if baseline:
+            ratio = row['vs_baseline']
+            cells.append(f'{ratio:.2f}x' if ratio else '-')
+        rows.append(cells)
+    print_table(header, rows)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Сжатие текстов заметок: объём в БД, задержка чтения и записи
+без сжатия и со сжатием zlib от порога NOTES_TEXT_COMPRESSION_MIN_BYTES.
+
+    python -m benchmarks.text_compression --notes 2000 --body-kb 64
+"""
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.common import print_table, setup_django, test_database
+from benchmarks.data import make_body
+
+LOG_LINE = (
+    '2026-10-18 12:{minute:02d}:{second:02d} INFO worker-{worker} '
+    'запрос {request} обработан за {ms} мс\n'
+)
+
+
+def make_log(rng, size):
+    """Журнал приложения примерно из size байт."""
+    lines = []
+    while size > 0:
+        line = LOG_LINE.format(
+            minute=rng.randrange(60), second=rng.randrange(60),
+            worker=rng.randrange(8), request=rng.randrange(10 ** 6),
+            ms=rng.randrange(500),
+        )
+        lines.append(line)
+        size -= len(line.encode())
+    return ''.join(lines)
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000
+
+
+def run(mode, min_bytes, texts, author, repeat):
+    from django.conf import settings
+    from django.db.models import Sum
+
+    from notes.functions import OctetLength
+    from notes.models import Note
+
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = min_bytes
+    Note.objects.all().delete()
+    writes = []
+    for index, text in enumerate(texts):
+        start = time.perf_counter()
+        Note.objects.create(
+            title='Журнал', text=text, slug=f'{mode}-{index}', author=author
+        )
+        writes.append(time.perf_counter() - start)
+    stored = Note.objects.aggregate(size=Sum(OctetLength('text')))['size']
+    reads = []
+    rng = random.Random(0)
+    for _ in range(repeat):
+        slug = f'{mode}-{rng.randrange(len(texts))}'
+        start = time.perf_counter()
+        Note.objects.get(author=author, slug=slug).text
+        reads.append(time.perf_counter() - start)
+    return stored, median_ms(writes), median_ms(reads)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=2000)
+    parser.add_argument('--body-kb', type=int, default=64)
+    parser.add_argument('--min-bytes', type=int, default=4096)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth import get_user_model
+
+    rng = random.Random(0)
+    size = args.body_kb * 1024
+    datasets = {
+        'logs': [make_log(rng, size) for _ in range(args.notes)],
+        # В среднем около 13 байт на слово.
+        'prose': [make_body(rng, size // 13) for _ in range(args.notes)],
+    }
+    rows = []
+    with test_database():
+        author = get_user_model().objects.create(username='benchmark')
+        for name, texts in datasets.items():
+            raw = sum(len(text.encode()) for text in texts)
+            for mode, min_bytes in (('plain', 0),
+                                    ('zlib', args.min_bytes)):
+                stored, write, read = run(
+                    mode, min_bytes, texts, author, args.repeat
+                )
+                rows.append((
+                    name, mode, f'{stored / 1024 ** 2:.1f}',
+                    f'{stored / raw:.2f}', f'{write:.3f}', f'{read:.3f}',
+                ))
+    print(f'{args.notes} notes, {args.body_kb} KB bodies')
+    print_table(
+        ('data', 'mode', 'stored MB', 'ratio', 'write ms', 'read ms'), rows
+    )
+
+
+if __name__ == '__main__':
+    main()
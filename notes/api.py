@@ -0,0 +1,224 @@
+"""
+JSON API заметок для клиентов синхронизации.
+
+Общие параметры запросов:
+- fields — нужные поля заметки через запятую, по умолчанию API_FIELDS;
+- since — только заметки, изменённые позже этого времени (ISO 8601);
+  окна синхронизаций пересекаются, повторы заметок клиент пропускает.
+
+Ответы помечены ETag из версии списка автора: пока заметки автора не
+менялись, повторный запрос с If-None-Match получает 304 без обращения
+к таблице заметок.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views import generic
+from django.views.decorators.http import condition
+
+from .cache import from_primary, list_version
+from .changes import ChangesGone, changes_after, latest_change_id
+from .models import Note, NoteChange
+from .pagination import InvalidCursor, KeysetPaginator
+
+API_FIELDS = ('id', 'slug', 'title', 'text', 'updated_at')
+ACTION_NAMES = {
+    NoteChange.CREATED: 'created',
+    NoteChange.UPDATED: 'updated',
+    NoteChange.DELETED: 'deleted',
+}
+
+
+class ApiError(Exception):
+    """Неверные параметры запроса, ответ 400."""
+
+
+def api_etag(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    query = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return '-'.join((
+        str(request.user.pk), list_version(request.user.pk),
+        request.path, query,
+    ))
+
+
+def serialize(note, fields):
+    return {field: getattr(note, field) for field in fields}
+
+
+@method_decorator(condition(etag_func=api_etag), name='dispatch')
+class ApiView(LoginRequiredMixin, generic.View):
+    """Базовый класс: только чтение, ошибки и отказ в доступе — JSON."""
+    http_method_names = ['get', 'head', 'options']
+
+    def handle_no_permission(self):
+        return JsonResponse({'error': 'Требуется вход.'}, status=401)
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'error': str(error)}, status=400)
+
+    def get_fields(self):
+        value = self.request.GET.get('fields')
+        if not value:
+            return API_FIELDS
+        fields = set(value.split(','))
+        unknown = fields - set(API_FIELDS)
+        if unknown:
+            raise ApiError(f'Неизвестные поля: {", ".join(sorted(unknown))}.')
+        return tuple(field for field in API_FIELDS if field in fields)
+
+    def get_queryset(self, fields, *required):
+        """
+        Заметки автора; из БД читаются только нужные поля. ETag ответов
+        API — версия списка, поэтому чтение с основной БД.
+        """
+        queryset = from_primary(Note.objects.filter(
+            author=self.request.user
+        )).only(*fields, *required)
+        since = self.request.GET.get('since')
+        if since:
+            try:
+                # ValueError — формат верный, но такой даты нет.
+                moment = parse_datetime(since)
+            except ValueError:
+                moment = None
+            if moment is None:
+                raise ApiError('Параметр since — время в формате ISO 8601.')
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            queryset = queryset.filter(updated_at__gt=moment)
+        return queryset
+
+
+class NoteListApi(ApiView):
+    """
+    Заметки автора постранично по курсору.
+
+    timestamp из ответа на первую страницу — значение since для
+    следующей синхронизации. Он на NOTES_API_SINCE_MARGIN секунд
+    раньше времени ответа, чтобы не потерять заметки из транзакций,
+    закоммиченных после ответа; заметки, изменённые в этом окне,
+    клиент получит повторно. Удалённые заметки в ответ не попадают.
+    """
+
+    def get(self, request):
+        timestamp = timezone.now() - timedelta(
+            seconds=settings.NOTES_API_SINCE_MARGIN
+        )
+        fields = self.get_fields()
+        paginator = KeysetPaginator(
+            self.get_queryset(fields, 'id'), settings.NOTES_PAGE_SIZE,
+            ordering=('author', 'id'),
+        )
+        try:
+            page = paginator.page(request.GET.get('cursor'))
+        except InvalidCursor:
+            raise ApiError('Неверный курсор страницы.')
+        return JsonResponse({
+            'results': [serialize(note, fields) for note in page],
+            'next': page.next_cursor,
+            'timestamp': timestamp,
+        })
+
+
+class NoteBatchApi(ApiView):
+    """Несколько заметок по slug одним запросом: ?slug=a&slug=b."""
+
+    def get(self, request):
+        slugs = list(dict.fromkeys(request.GET.getlist('slug')))
+        if not slugs:
+            raise ApiError('Передайте хотя бы один slug.')
+        if len(slugs) > settings.NOTES_API_BATCH_MAX:
+            raise ApiError(
+                f'За один запрос можно получить не больше '
+                f'{settings.NOTES_API_BATCH_MAX} заметок.'
+            )
+        fields = self.get_fields()
+        notes = {
+            note.slug: note
+            for note in self.get_queryset(fields, 'slug').filter(
+                slug__in=slugs
+            )
+        }
+        return JsonResponse({
+            'results': [
+                serialize(notes[slug], fields)
+                for slug in slugs if slug in notes
+            ],
+            'missing': [slug for slug in slugs if slug not in notes],
+        })
+
+
+class NoteDetailApi(ApiView):
+    """Одна заметка по slug."""
+
+    def get(self, request, slug):
+        fields = self.get_fields()
+        note = self.get_queryset(fields).filter(slug=slug).first()
+        if note is None:
+            return JsonResponse({'error': 'Заметка не найдена.'}, status=404)
+        return JsonResponse(serialize(note, fields))
+
+
+class NoteChangesApi(ApiView):
+    """
+    Изменения заметок автора после курсора: ?cursor=<id>.
+
+    Без курсора возвращает текущий курсор: с него клиент читает ленту
+    после полной синхронизации через список. К созданным и изменённым
+    заметкам прикладываются их текущие поля. Если журнал сжат дальше
+    курсора клиента, ответ 410 Gone.
+    """
+
+    def get(self, request):
+        cursor = request.GET.get('cursor')
+        if cursor is None:
+            return JsonResponse({
+                'changes': [],
+                'cursor': latest_change_id(request.user),
+                'has_more': False,
+            })
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            raise ApiError('Курсор ленты — целое число.')
+        limit = settings.NOTES_CHANGES_PAGE_SIZE
+        try:
+            changes = changes_after(request.user, cursor, limit + 1)
+        except ChangesGone as error:
+            return JsonResponse({
+                'error': 'Журнал изменений сжат, синхронизируйтесь заново.',
+                'horizon': error.horizon,
+            }, status=410)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        fields = self.get_fields()
+        notes = self.get_queryset(fields, 'id').filter(id__in=[
+            change.note_id for change in changes
+            if change.action != NoteChange.DELETED
+        ]).in_bulk()
+        return JsonResponse({
+            'changes': [
+                {
+                    'id': change.id,
+                    'action': ACTION_NAMES[change.action],
+                    'note_id': change.note_id,
+                    'slug': change.slug,
+                    'note': serialize(notes[change.note_id], fields)
+                    if change.note_id in notes else None,
+                }
+                for change in changes
+            ],
+            'cursor': changes[-1].id if changes else cursor,
+            'has_more': has_more,
+        })
@@ -0,0 +1,12 @@
+from django.urls import path
+
+from notes import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('notes/', api.NoteListApi.as_view(), name='list'),
+    path('batch/', api.NoteBatchApi.as_view(), name='batch'),
+    path('changes/', api.NoteChangesApi.as_view(), name='changes'),
+    path('notes/<slug:slug>/', api.NoteDetailApi.as_view(), name='detail'),
+]
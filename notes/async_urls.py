@@ -0,0 +1,13 @@
+from django.urls import path
+
+from notes import async_views
+
+app_name = 'notes_async'
+
+urlpatterns = [
+    path('add/', async_views.note_create, name='add'),
+    path('edit/<slug:slug>/', async_views.note_update, name='edit'),
+    path('note/<slug:slug>/', async_views.note_detail, name='detail'),
+    path('delete/<slug:slug>/', async_views.note_delete, name='delete'),
+    path('notes/', async_views.notes_list, name='list'),
+]
@@ -0,0 +1,217 @@
+"""
+Асинхронные версии представлений заметок для запуска под ASGI.
+
+В Django 3.2 нет асинхронного ORM, поэтому вся работа с БД одного
+запроса собрана в одну синхронную функцию и выполняется в пуле потоков
+(thread_sensitive=False), а не в общем потоке для синхронного кода,
+через который Django пропускает обычные представления. Шаблоны
+отрисовываются в цикле событий: к моменту отрисовки все данные из БД
+уже прочитаны.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import close_old_connections
+from django.http import Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import from_primary, list_version
+from .forms import WARNING, NoteForm
+from .instrumentation import measure_queries
+from .models import Note
+from .pagination import InvalidCursor, KeysetPaginator
+from .slugs import SlugConflict
+from .summary import summary_for
+from .views import note_last_modified, note_page_etag, notes_list_etag
+
+
+def in_db_thread(func):
+    """
+    Запускает синхронный код с БД в пуле потоков.
+
+    Соединения потоков пула не проходят через request_started и
+    request_finished, поэтому устаревшие (CONN_MAX_AGE) и сломанные
+    соединения закрываются здесь, до и после работы с БД. Здесь же
+    запросы потока попадают в замеры запроса (NOTES_INSTRUMENTATION).
+    """
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            with measure_queries():
+                return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def async_login_required(view):
+    """Асинхронный аналог LoginRequiredMixin."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await in_db_thread(get_user)(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        request.user = user
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """Ответ 304, если у клиента актуальная версия страницы."""
+    if last_modified is not None:
+        last_modified = int(last_modified.timestamp())
+    return get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag is not None:
+        response['ETag'] = f'"{etag}"'
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+async def render_page(request, template_name, context):
+    """
+    Аналог render для асинхронных представлений. Шаблон рисуется в цикле
+    событий, поэтому сводку заметок для шапки читаем заранее.
+    """
+    if not hasattr(request, 'notes_summary'):
+        request.notes_summary = await in_db_thread(summary_for)(request.user)
+    return render(request, template_name, context)
+
+
+def load_list(request):
+    etag = notes_list_etag(request)
+    if not_modified(request, etag=f'"{etag}"'):
+        return etag, None
+    paginator = KeysetPaginator(
+        from_primary(Note.objects.filter(author=request.user)).only(
+            *Note.LIST_FIELDS
+        ),
+        settings.NOTES_PAGE_SIZE,
+        ordering=('author', 'id'),
+    )
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        raise Http404('Неверный курсор страницы.')
+    version = list_version(request.user.pk)
+    fragment = make_template_fragment_key(
+        'notes_list',
+        [request.user.pk, version, request.GET.get('cursor', '')],
+    )
+    # Читаем записи и сводку здесь, чтобы шаблон не обращался к БД.
+    # Если фрагмент списка в кэше, записи шаблону не понадобятся.
+    if cache.get(fragment) is None:
+        len(page)
+    request.notes_summary = summary_for(request.user)
+    return etag, {
+        'object_list': page,
+        'page_obj': page,
+        'is_paginated': True,
+        'list_cache_timeout': settings.NOTES_LIST_CACHE_TIMEOUT,
+        'list_version': version,
+    }
+
+
+@async_login_required
+async def notes_list(request):
+    """Список заметок пользователя."""
+    etag, context = await in_db_thread(load_list)(request)
+    if context is None:
+        return not_modified(request, etag=f'"{etag}"')
+    response = await render_page(request, 'notes/list.html', context)
+    return set_validators(response, etag=etag)
+
+
+def load_detail(request, slug):
+    etag = note_page_etag(request, slug)
+    last_modified = note_last_modified(request, slug)
+    response = not_modified(
+        request, etag=etag and f'"{etag}"', last_modified=last_modified
+    )
+    if response is not None:
+        return response, etag, last_modified, None
+    note = get_object_or_404(Note, author=request.user, slug=slug)
+    request.notes_summary = summary_for(request.user)
+    return None, etag, last_modified, note
+
+
+@async_login_required
+async def note_detail(request, slug):
+    """Заметка подробно."""
+    response, etag, last_modified, note = await in_db_thread(load_detail)(
+        request, slug
+    )
+    if response is None:
+        response = await render_page(
+            request, 'notes/detail.html', {'object': note, 'note': note}
+        )
+    return set_validators(response, etag=etag, last_modified=last_modified)
+
+
+def save_form(form):
+    """Проверяет и сохраняет форму; занятый slug — ошибка поля."""
+    if not form.is_valid():
+        return False
+    try:
+        form.save()
+    except SlugConflict as error:
+        form.add_error('slug', error.slug + WARNING)
+        return False
+    return True
+
+
+async def edit_note(request, note=None):
+    if request.method == 'POST':
+        form = NoteForm(request.POST, instance=note)
+        if note is None:
+            form.instance.author = request.user
+        if await in_db_thread(save_form)(form):
+            return redirect('notes:success')
+    else:
+        form = NoteForm(instance=note)
+    return await render_page(
+        request, 'notes/form.html',
+        {'form': form, 'object': note, 'note': note},
+    )
+
+
+@async_login_required
+async def note_create(request):
+    """Добавление заметки."""
+    return await edit_note(request)
+
+
+@async_login_required
+async def note_update(request, slug):
+    """Редактирование заметки."""
+    note = await in_db_thread(get_object_or_404)(
+        Note, author=request.user, slug=slug
+    )
+    return await edit_note(request, note)
+
+
+@async_login_required
+async def note_delete(request, slug):
+    """Удаление заметки."""
+    note = await in_db_thread(get_object_or_404)(
+        Note, author=request.user, slug=slug
+    )
+    if request.method == 'POST':
+        await in_db_thread(note.delete)()
+        return redirect('notes:success')
+    return await render_page(
+        request, 'notes/delete.html', {'object': note, 'note': note}
+    )
@@ -0,0 +1,50 @@
+"""Операции над несколькими заметками автора одним запросом к БД."""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .changes import batched_changes
+from .models import Note
+from .signals import notes_bulk_updated
+from .summary import deleting, remove_notes
+
+DELETED = 'deleted'
+UPDATED = 'updated'
+NOT_FOUND = 'not_found'
+
+
+def bulk_change(author, slugs=(), ids=(), changes=None):
+    """
+    Удаляет заметки автора или, если заданы changes, меняет их поля.
+
+    Заметки выбираются по slug и id одним запросом, чужие и
+    несуществующие не трогаются. Всё выполняется в одной транзакции.
+    Возвращает список {'note': slug или id, 'status': ...} в порядке
+    запроса.
+    """
+    with transaction.atomic():
+        rows = list(Note.objects.filter(
+            Q(slug__in=slugs) | Q(id__in=ids), author=author
+        ).values_list('id', 'slug'))
+        found_slugs = {slug for _, slug in rows}
+        found_ids = {pk for pk, _ in rows}
+        notes = Note.objects.filter(author=author, id__in=found_ids)
+        done = UPDATED if changes else DELETED
+        if found_ids and changes:
+            # Новые значения прибавит к сводке автора сигнал.
+            remove_notes(author.pk, notes)
+            notes.update(**changes, updated_at=timezone.now())
+            notes_bulk_updated.send(sender=Note, notes=list(notes))
+        elif found_ids:
+            # Для сигналов post_delete хватает id, slug и автора, тексты
+            # заметок не читаем. Записи журнала и сводка автора — одним
+            # запросом каждая.
+            with batched_changes(), deleting(author.pk, notes):
+                notes.only('id', 'slug', 'author_id').delete()
+    return [
+        {'note': slug, 'status': done if slug in found_slugs else NOT_FOUND}
+        for slug in slugs
+    ] + [
+        {'note': pk, 'status': done if pk in found_ids else NOT_FOUND}
+        for pk in ids
+    ]
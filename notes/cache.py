@@ -0,0 +1,49 @@
+from functools import partial
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+
+def _version_key(author_id):
+    return f'notes:list-version:{author_id}'
+
+
+def list_version(author_id):
+    """
+    Текущая версия списка заметок автора.
+
+    Версия входит в ключ закэшированного фрагмента списка. Пока заметки
+    автора не меняются, версия та же и фрагмент берётся из кэша.
+    """
+    key = _version_key(author_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_list_version(*author_ids):
+    """
+    Сбрасывает версию: старые фрагменты больше не будут прочитаны.
+
+    Внутри транзакции версия сбрасывается после коммита. Иначе запрос,
+    прочитавший старые данные до коммита, закэшировал бы их под новой
+    версией, и устаревший список жил бы до следующего изменения.
+    """
+    keys = [_version_key(author_id) for author_id in author_ids]
+    if keys:
+        transaction.on_commit(partial(cache.delete_many, keys))
+
+
+def from_primary(queryset):
+    """
+    QuerySet, читающий с основной БД, а не с реплики.
+
+    Так читается всё, что кэшируется под версией списка или отдаётся
+    с ETag из неё. Версия сбрасывается после коммита, но отстающая
+    реплика и после этого вернёт старые строки, и они остались бы в
+    кэше (или у клиента) под новой версией до следующего изменения.
+    """
+    return queryset.using(DEFAULT_DB_ALIAS)
@@ -0,0 +1,147 @@
+"""Журнал изменений заметок: запись, сжатие и чтение ленты автора."""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+
+from .cache import from_primary
+from .models import NoteChange, NoteChangeHorizon, NoteSummary
+
+# Записи, накопленные внутри batched_changes().
+_pending = ContextVar('notes_pending_changes', default=None)
+# id удаляемых пользователей: их заметки удаляются вместе с журналом,
+# записи об удалении для них не нужны и ссылались бы на удалённого.
+_deleted_authors = ContextVar('notes_deleted_authors', default=frozenset())
+
+
+class ChangesGone(Exception):
+    """Курсор клиента старше границы сжатого журнала."""
+
+    def __init__(self, horizon):
+        super().__init__(horizon)
+        self.horizon = horizon
+
+
+def record_changes(notes, action):
+    """Записывает в журнал действие action для каждой заметки."""
+    deleted_authors = _deleted_authors.get()
+    entries = [
+        NoteChange(
+            author_id=note.author_id, note_id=note.pk, slug=note.slug,
+            action=action,
+        )
+        for note in notes if note.author_id not in deleted_authors
+    ]
+    pending = _pending.get()
+    if pending is not None:
+        pending.extend(entries)
+    elif entries:
+        _append(entries)
+
+
+def _append(entries):
+    """
+    Сохраняет записи журнала, по очереди для каждого автора.
+
+    id записей выдаются при вставке, а видны они после коммита, и без
+    очереди запись с меньшим id могла бы стать видна позже записи с
+    большим: клиент, уже сдвинувший курсор, её пропустил бы. Поэтому до
+    вставки блокируется строка сводки автора (её и так меняет каждая
+    запись заметок), и пока транзакция не завершится, другие записи
+    журнала этого автора ждут.
+    """
+    authors = sorted({entry.author_id for entry in entries})
+    # Без точки сохранения: блокировка всё равно держится до конца
+    # внешней транзакции.
+    with transaction.atomic(savepoint=False):
+        list(from_primary(
+            NoteSummary.objects.select_for_update()
+        ).filter(author_id__in=authors).order_by(
+            'author_id'
+        ).values_list('pk', flat=True))
+        NoteChange.objects.bulk_create(entries)
+
+
+def author_deleting(author_id):
+    """
+    Пользователь удаляется: журнал его заметок больше не ведётся.
+    Возвращает метку для author_deleted().
+    """
+    return _deleted_authors.set(_deleted_authors.get() | {author_id})
+
+
+def author_deleted(token):
+    _deleted_authors.reset(token)
+
+
+@contextmanager
+def batched_changes():
+    """
+    Копит записи журнала и сохраняет их одним bulk_create в конце.
+
+    Нужен там, где сигналы приходят по одному на заметку, например при
+    удалении QuerySet.delete().
+    """
+    token = _pending.set([])
+    try:
+        yield
+        entries = _pending.get()
+    finally:
+        _pending.reset(token)
+    if entries:
+        _append(entries)
+
+
+def horizon(author):
+    return from_primary(
+        NoteChangeHorizon.objects.filter(author=author)
+    ).values_list('change_id', flat=True).first() or 0
+
+
+def latest_change_id(author):
+    """Курсор, с которого начинается лента после полной синхронизации."""
+    latest = from_primary(
+        NoteChange.objects.filter(author=author)
+    ).aggregate(latest=Max('id'))['latest']
+    # Если сжатие удалило все записи автора, курсор — граница журнала.
+    return latest or horizon(author)
+
+
+def changes_after(author, cursor, limit):
+    """
+    До limit записей журнала автора с id больше cursor.
+
+    Если часть записей после cursor уже удалена сжатием, выбрасывает
+    ChangesGone: такому клиенту нужна полная синхронизация.
+    """
+    boundary = horizon(author)
+    if cursor < boundary:
+        raise ChangesGone(boundary)
+    return list(from_primary(NoteChange.objects.filter(
+        author=author, id__gt=cursor
+    )).order_by('id')[:limit])
+
+
+def compact_changes(before):
+    """
+    Сжимает журнал, возвращает пару (заменённых, устаревших) записей.
+
+    Запись заменена, если после неё есть запись о той же заметке:
+    клиенту достаточно последней. Такие записи удаляются без
+    последствий. Записи старше before удаляются, а граница журнала
+    автора сдвигается, чтобы отставшие клиенты получили 410.
+    """
+    later = NoteChange.objects.filter(
+        note_id=OuterRef('note_id'), id__gt=OuterRef('id')
+    )
+    superseded, _ = NoteChange.objects.filter(Exists(later)).delete()
+    old = NoteChange.objects.filter(created_at__lt=before)
+    horizons = old.values('author').annotate(change_id=Max('id'))
+    for row in horizons:
+        NoteChangeHorizon.objects.update_or_create(
+            author_id=row['author'],
+            defaults={'change_id': row['change_id']},
+        )
+    expired, _ = old.delete()
+    return superseded, expired
@@ -0,0 +1,16 @@
+from functools import partial
+
+from django.utils.functional import SimpleLazyObject
+
+from .summary import summary_for
+
+
+def notes_summary(request):
+    """
+    Сводка заметок пользователя для шапки. Читается из БД, только если
+    шаблон её выводит; асинхронные представления читают её заранее.
+    """
+    summary = getattr(request, 'notes_summary', None)
+    if summary is None:
+        summary = SimpleLazyObject(partial(summary_for, request.user))
+    return {'notes_summary': summary}
@@ -0,0 +1,66 @@
+"""Поля моделей заметок."""
+import base64
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+# Признак сжатого значения. Текст, который сам начинается с признака,
+# всегда хранится сжатым, поэтому значения не путаются.
+MARKER = '\x01zlib:'
+LEVEL = 6
+
+
+def pack_text(value, min_bytes):
+    """
+    Значение для записи в БД: сжатое, если текст не короче min_bytes
+    байт и сжатый вид занимает меньше места. min_bytes=0 — не сжимать.
+    """
+    forced = value.startswith(MARKER)
+    if not forced and not min_bytes:
+        return value
+    raw = value.encode()
+    if not forced and len(raw) < min_bytes:
+        return value
+    packed = MARKER + base64.b64encode(zlib.compress(raw, LEVEL)).decode()
+    if forced or len(packed) < len(raw):
+        return packed
+    return value
+
+
+def unpack_text(value):
+    """Исходный текст из значения, прочитанного из БД."""
+    if not value or not value.startswith(MARKER):
+        return value
+    try:
+        return zlib.decompress(
+            base64.b64decode(value[len(MARKER):], validate=True)
+        ).decode()
+    except (ValueError, zlib.error):
+        # Не сжатое значение, записанное в обход поля.
+        return value
+
+
+def is_packed(value):
+    return bool(value) and value.startswith(MARKER)
+
+
+class CompressibleTextField(models.TextField):
+    """
+    TextField, который хранит длинные тексты сжатыми zlib.
+
+    Порог задаёт настройка NOTES_TEXT_COMPRESSION_MIN_BYTES. Сжатые
+    значения распаковываются при чтении всегда, даже если сжатие
+    выключено, поэтому настройку можно менять в любой момент.
+    Поиск по подстроке средствами БД (icontains) по сжатым текстам
+    не работает.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        return unpack_text(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return value
+        return pack_text(value, settings.NOTES_TEXT_COMPRESSION_MIN_BYTES)
@@ -1,7 +1,5 @@
-from pytils.translit import slugify
-
 from django import forms
-from django.core.exceptions import ValidationError
+from django.conf import settings
 
 from .models import Note
 
@@ -15,15 +13,68 @@ class NoteForm(forms.ModelForm):
         model = Note
         fields = ('title', 'text', 'slug')
 
-    def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+    def validate_unique(self):
+        """
+        Уникальность slug не проверяется отдельным запросом:
+        её гарантирует ограничение в БД при сохранении заметки.
+        """
+        exclude = set(self._get_validation_exclusions()) | {'slug'}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except forms.ValidationError as error:
+            self._update_errors(error)
+
+
+class ListField(forms.Field):
+    """Несколько значений под одним именем, каждое проверяет item_field."""
+    widget = forms.MultipleHiddenInput
+
+    def __init__(self, item_field, **kwargs):
+        self.item_field = item_field
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        values = [self.item_field.clean(item) for item in value or ()]
+        # Повторы отбрасываются, порядок сохраняется.
+        return list(dict.fromkeys(values))
+
+
+class NoteBulkForm(forms.Form):
+    """Удаление или изменение нескольких заметок по slug или id."""
+    DELETE = 'delete'
+    UPDATE = 'update'
+
+    action = forms.ChoiceField(
+        choices=((DELETE, 'Удалить'), (UPDATE, 'Изменить'))
+    )
+    notes = ListField(forms.SlugField(), required=False)
+    ids = ListField(forms.IntegerField(min_value=1), required=False)
+    title = forms.CharField(
+        max_length=Note._meta.get_field('title').max_length, required=False
+    )
+    text = forms.CharField(required=False)
+
+    def clean(self):
         cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
-            raise ValidationError(slug + WARNING)
-        return slug
+        count = len(cleaned_data.get('notes', ())) + len(
+            cleaned_data.get('ids', ())
+        )
+        if not count and not self.errors:
+            raise forms.ValidationError('Не выбрано ни одной заметки.')
+        if count > settings.NOTES_BULK_MAX:
+            raise forms.ValidationError(
+                f'За один раз можно обработать не больше '
+                f'{settings.NOTES_BULK_MAX} заметок.'
+            )
+        if cleaned_data.get('action') == self.UPDATE and not (
+            cleaned_data.get('title') or cleaned_data.get('text')
+        ):
+            raise forms.ValidationError('Укажите новый заголовок или текст.')
+        return cleaned_data
+
+    def changes(self):
+        """Поля, которые получат выбранные заметки."""
+        return {
+            field: self.cleaned_data[field] for field in ('title', 'text')
+            if self.cleaned_data[field]
+        }
@@ -0,0 +1,43 @@
+"""Функции БД, которых нет в django.db.models.functions."""
+from django.db.models import BinaryField, Func, IntegerField, Value
+
+
+class OctetLength(Func):
+    """Размер значения в байтах, а не в символах, как у Length."""
+    function = 'OCTET_LENGTH'
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='LENGTH(CAST(%(expressions)s AS BLOB))',
+            **extra_context,
+        )
+
+
+class Utf8Bytes(Func):
+    """Текст в виде байтов UTF-8."""
+    function = 'CONVERT_TO'
+    template = "%(function)s(%(expressions)s, 'UTF8')"
+    output_field = BinaryField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='CAST(%(expressions)s AS BLOB)',
+            **extra_context,
+        )
+
+
+class ByteSubstr(Func):
+    """
+    Часть текста в байтах UTF-8: позиция считается с 1, длина в байтах.
+    Граница части может прийтись на середину многобайтового символа.
+    """
+    function = 'SUBSTR'
+    output_field = BinaryField()
+
+    def __init__(self, expression, position, length, **extra):
+        super().__init__(
+            Utf8Bytes(expression), Value(position), Value(length), **extra
+        )
@@ -0,0 +1,186 @@
+"""
+Замеры времени для страниц заметок: число запросов и время в БД,
+отрисовка шаблона, остальной Python и общее время ответа.
+
+Включается настройкой NOTES_INSTRUMENTATION. Когда она выключена,
+middleware сообщает Django MiddlewareNotUsed и не попадает в цепочку
+обработки запроса вовсе.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('notes.instrumentation')
+
+# Какие представления замеряются: пространства имён из notes.urls
+# и notes.async_urls.
+NAMESPACES = ('notes', 'notes_async')
+METRICS = ('queries', 'db', 'template', 'python', 'total')
+PROCESSES_KEY = 'notes:timings:processes'
+
+# Замеры текущего запроса. Переменная контекста переходит вместе с
+# запросом в асинхронное представление и в потоки пула, где оно
+# работает с БД.
+_timing = ContextVar('notes_request_timing', default=None)
+
+
+class RequestTiming:
+    """Замеры одного запроса; заодно обёртка для execute_wrapper."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db += time.perf_counter() - start
+
+    def server_timing(self, total):
+        python = max(total - self.db - self.template, 0)
+        return ', '.join((
+            f'db;dur={self.db * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template * 1000:.2f}',
+            f'app;dur={python * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+
+    def as_dict(self, total):
+        return {
+            'queries': self.queries,
+            'db': self.db,
+            'template': self.template,
+            'python': max(total - self.db - self.template, 0),
+            'total': total,
+        }
+
+
+class TimingStore:
+    """
+    Последние NOTES_INSTRUMENTATION_WINDOW замеров каждого представления.
+
+    Процесс раз в NOTES_INSTRUMENTATION_FLUSH секунд кладёт свои замеры
+    в кэш, откуда их читает команда notes_timings.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(
+            lambda: deque(maxlen=settings.NOTES_INSTRUMENTATION_WINDOW)
+        )
+        self.flushed_at = 0.0
+        self.key = f'notes:timings:{socket.gethostname()}:{os.getpid()}'
+
+    def add(self, view_name, sample):
+        with self.lock:
+            self.samples[view_name].append(sample)
+            now = time.monotonic()
+            if now - self.flushed_at < settings.NOTES_INSTRUMENTATION_FLUSH:
+                return
+            self.flushed_at = now
+            snapshot = {
+                name: list(samples) for name, samples in self.samples.items()
+            }
+        self.flush(snapshot)
+
+    def flush(self, snapshot):
+        timeout = settings.NOTES_INSTRUMENTATION_TTL
+        cache.set(self.key, snapshot, timeout)
+        processes = cache.get(PROCESSES_KEY, set())
+        if self.key not in processes:
+            cache.set(PROCESSES_KEY, processes | {self.key}, timeout)
+
+
+store = TimingStore()
+
+
+def collected_samples():
+    """Замеры всех процессов из кэша: {представление: [замеры]}."""
+    merged = defaultdict(list)
+    for snapshot in cache.get_many(cache.get(PROCESSES_KEY, set())).values():
+        for view_name, samples in snapshot.items():
+            merged[view_name].extend(samples)
+    return merged
+
+
+@contextmanager
+def measure_queries():
+    """
+    Учитывает запросы к БД текущего потока в замерах текущего запроса.
+
+    execute_wrapper ставится на соединения одного потока, поэтому
+    код, который ходит в БД из других потоков (notes.async_views),
+    оборачивается этим контекстом там, где выполняется.
+    """
+    timing = _timing.get()
+    with ExitStack() as stack:
+        if timing is not None:
+            for connection in connections.all():
+                if timing not in connection.execute_wrappers:
+                    stack.enter_context(connection.execute_wrapper(timing))
+        yield
+
+
+class InstrumentationMiddleware:
+    """
+    Добавляет к ответам страниц заметок заголовок Server-Timing,
+    пишет строку JSON в лог notes.instrumentation и копит замеры
+    для команды notes_timings.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NOTES_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = request.notes_timing = RequestTiming()
+        start = time.perf_counter()
+        token = _timing.set(timing)
+        try:
+            with measure_queries():
+                response = self.get_response(request)
+        finally:
+            _timing.reset(token)
+        total = time.perf_counter() - start
+        match = request.resolver_match
+        if match is None or match.namespace not in NAMESPACES:
+            return response
+        response['Server-Timing'] = timing.server_timing(total)
+        sample = timing.as_dict(total)
+        logger.info(json.dumps({
+            'view': match.view_name,
+            'method': request.method,
+            'status': response.status_code,
+            **sample,
+        }))
+        store.add(match.view_name, sample)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = request.notes_timing
+        start = time.perf_counter()
+        db_before = timing.db
+
+        def rendered(response):
+            # Запросы во время отрисовки уже учтены во времени БД.
+            spent = time.perf_counter() - start
+            timing.template += spent - (timing.db - db_before)
+
+        response.add_post_render_callback(rendered)
+        return response
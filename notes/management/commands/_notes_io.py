@@ -0,0 +1,61 @@
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.core.management.base import CommandError
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('title', 'text', 'slug', 'author')
+
+
+def detect_format(path, fmt):
+    """Формат из аргумента или по расширению файла."""
+    if fmt:
+        return fmt
+    suffix = Path(path).suffix.lstrip('.').lower()
+    if suffix in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if suffix == 'csv':
+        return 'csv'
+    raise CommandError(
+        f'Не удалось определить формат файла {path}, укажите --format.'
+    )
+
+
+@contextmanager
+def open_stream(path, mode):
+    """Файл или stdin/stdout, если вместо пути передан «-»."""
+    if path == '-':
+        yield sys.stdin if 'r' in mode else sys.stdout
+        return
+    with open(path, mode, encoding='utf-8', newline='') as stream:
+        yield stream
+
+
+def read_rows(stream, fmt):
+    """Построчно читает заметки, не загружая файл целиком."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RowWriter:
+    """Построчная запись заметок в JSON Lines или CSV."""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(stream, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, row):
+        if self.fmt == 'csv':
+            self.writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
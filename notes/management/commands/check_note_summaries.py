@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.summary import check_summaries, summary_fields
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет сводки заметок авторов с таблицей заметок. При '
+        'расхождениях выводит их и завершается с ошибкой; исправить '
+        'можно командой rebuild_note_summaries.'
+    )
+
+    def handle(self, *args, **options):
+        problems = check_summaries()
+        for author_id, stored, actual in problems:
+            stored = summary_fields(stored) if stored else 'нет сводки'
+            self.stdout.write(
+                f'Автор {author_id}: в сводке {stored}, '
+                f'на самом деле {summary_fields(actual)}'
+            )
+        if problems:
+            raise CommandError(f'Расхождений: {len(problems)}.')
+        self.stdout.write(self.style.SUCCESS('Сводки совпадают.'))
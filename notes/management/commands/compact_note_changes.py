@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from notes.changes import compact_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает журнал изменений заметок: удаляет записи, после которых '
+        'есть более новые о той же заметке, и записи старше --days дней. '
+        'Клиенты с курсором старше удалённых записей получат 410 и '
+        'синхронизируются заново.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.NOTES_CHANGE_LOG_DAYS,
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            superseded, expired = compact_changes(before)
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено записей: заменённых {superseded}, '
+            f'устаревших {expired}.'
+        ))
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import ExpressionWrapper, F, TextField, Value
+
+from notes.fields import MARKER, pack_text, unpack_text
+from notes.functions import OctetLength
+from notes.models import Note
+from notes.summary import change_text_bytes
+
+
+class Command(BaseCommand):
+    help = (
+        'Сжимает уже записанные тексты заметок от порога '
+        'NOTES_TEXT_COMPRESSION_MIN_BYTES байт; с --decompress '
+        'возвращает их в несжатый вид. Дата изменения заметок, '
+        'журнал изменений и поисковый индекс не меняются, объём '
+        'текстов в сводках авторов пересчитывается. Передача '
+        'переписанных текстов, начатая до сжатия, обрывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--min-bytes', type=int,
+            default=settings.NOTES_TEXT_COMPRESSION_MIN_BYTES,
+        )
+        parser.add_argument('--decompress', action='store_true')
+
+    def handle(self, *args, **options):
+        decompress = options['decompress']
+        min_bytes = options['min_bytes']
+        if not decompress and not min_bytes:
+            self.stderr.write('Сжатие выключено: --min-bytes 0.')
+            return
+        queryset = Note.objects.annotate(
+            # Значение как оно лежит в БД, без распаковки полем.
+            stored=ExpressionWrapper(F('text'), output_field=TextField()),
+        )
+        if decompress:
+            queryset = queryset.filter(text__startswith=MARKER)
+        else:
+            queryset = queryset.annotate(
+                size=OctetLength('text')
+            ).filter(size__gte=min_bytes).exclude(text__startswith=MARKER)
+        changed = before = after = last_id = 0
+        while True:
+            # Постранично по id, каждая пачка в своей транзакции. Строки
+            # пачки заблокированы от чтения до записи: правка заметки
+            # в это время не затрётся текстом, прочитанным до неё.
+            with transaction.atomic():
+                rows = list(queryset.select_for_update().filter(
+                    id__gt=last_id
+                ).order_by('id').values_list(
+                    'id', 'author_id', 'stored'
+                )[:options['batch_size']])
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                notes = []
+                deltas = {}
+                for pk, author_id, stored in rows:
+                    text = unpack_text(stored)
+                    target = (
+                        text if decompress else pack_text(text, min_bytes)
+                    )
+                    if target == stored:
+                        continue
+                    old_size = len(stored.encode())
+                    new_size = len(target.encode())
+                    before += old_size
+                    after += new_size
+                    deltas[author_id] = (
+                        deltas.get(author_id, 0) + new_size - old_size
+                    )
+                    notes.append(Note(
+                        pk=pk, text=Value(target, output_field=TextField())
+                    ))
+                Note.objects.bulk_update(notes, ['text'])
+                change_text_bytes(deltas)
+            changed += len(notes)
+        self.stdout.write(self.style.SUCCESS(
+            f'Изменено заметок: {changed}, '
+            f'байт было {before}, стало {after}.'
+        ))
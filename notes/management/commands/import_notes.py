@@ -0,0 +1,140 @@
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.models import Note
+from notes.signals import notes_bulk_created
+from notes.slugs import (
+    SlugConflict, allocate_slugs, slug_base, slug_candidates,
+)
+
+from ._notes_io import FORMATS, detect_format, open_stream, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки из JSON Lines или CSV пачками через '
+        'bulk_create. Память не зависит от размера файла.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу или «-» для stdin.')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--author',
+            help='Автор заметок, у которых в файле не указан author.',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--on-conflict', choices=('rename', 'skip'), default='rename',
+            help='Что делать с занятым slug: добавить суффикс или '
+                 'пропустить заметку.',
+        )
+
+    def handle(self, *args, **options):
+        fmt = detect_format(options['path'], options['format'])
+        self.default_author = options['author']
+        self.rename = options['on_conflict'] == 'rename'
+        self.authors = {}
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        imported = skipped = 0
+        start = time.perf_counter()
+        with open_stream(options['path'], 'r') as stream:
+            rows = read_rows(stream, fmt)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                created, failed = self.import_batch(batch)
+                imported += created
+                skipped += failed
+                if options['verbosity'] > 1:
+                    self.stdout.write(f'Загружено {imported} заметок...')
+        elapsed = time.perf_counter() - start
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено {imported} заметок, пропущено {skipped} '
+            f'за {elapsed:.1f} с ({rate:.0f} строк/с).'
+        ))
+
+    def author_id(self, username):
+        username = username or self.default_author
+        if not username:
+            raise CommandError(
+                'У заметки не указан автор, передайте --author.'
+            )
+        if username not in self.authors:
+            try:
+                self.authors[username] = get_user_model().objects.get(
+                    username=username
+                ).pk
+            except get_user_model().DoesNotExist:
+                raise CommandError(f'Пользователь {username} не найден.')
+        return self.authors[username]
+
+    def import_batch(self, rows):
+        """Сохраняет пачку заметок, возвращает (создано, пропущено)."""
+        notes = [
+            Note(
+                title=row['title'],
+                text=row.get('text') or '',
+                slug=row.get('slug') or '',
+                author_id=self.author_id(row.get('author')),
+            )
+            for row in rows
+        ]
+        bases = {id(note): slug_base(note, self.rename) for note in notes}
+        failed = {
+            id(note) for note in
+            allocate_slugs(notes, Note.objects, rename=self.rename)
+        }
+        notes = [note for note in notes if id(note) not in failed]
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+                self.saved_in_bulk(notes)
+        except IntegrityError:
+            # Адрес успели занять параллельно: сохраняем пачку поштучно.
+            return self.import_one_by_one(notes, bases, len(failed))
+        return len(notes), len(failed)
+
+    def saved_in_bulk(self, notes):
+        if notes and notes[0].pk is None:
+            # Не все БД возвращают pk из bulk_create, дочитываем их.
+            ids = dict(Note.objects.filter(
+                slug__in=[note.slug for note in notes]
+            ).values_list('slug', 'id'))
+            for note in notes:
+                note.pk = ids[note.slug]
+        # bulk_create не отправляет post_save. Сводки авторов меняются
+        # в той же транзакции.
+        notes_bulk_created.send(sender=Note, notes=notes)
+
+    def import_one_by_one(self, notes, bases, skipped):
+        created = 0
+        for note in notes:
+            if self.save_one(note, *bases[id(note)]):
+                created += 1
+            else:
+                skipped += 1
+        return created, skipped
+
+    def save_one(self, note, base, attempts):
+        """
+        Сохраняет заметку, перебирая адреса так же, как allocate_slugs:
+        base, base-2, base-3... Возвращает False, если все заняты.
+        """
+        max_length = Note._meta.get_field('slug').max_length
+        for slug in slug_candidates(base, max_length, attempts):
+            note.slug = slug
+            try:
+                note.save()
+            except SlugConflict:
+                continue
+            return True
+        return False
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+
+from notes.instrumentation import collected_samples
+
+# Границы корзин гистограммы общего времени ответа, мс.
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000)
+BAR_WIDTH = 40
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает замеры страниц заметок, собранные '
+        'InstrumentationMiddleware во всех процессах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', help='Только это представление.')
+        parser.add_argument(
+            '--no-histogram', action='store_true',
+            help='Не рисовать гистограммы.',
+        )
+
+    def handle(self, *args, **options):
+        samples = collected_samples()
+        if options['view']:
+            samples = {options['view']: samples.get(options['view'], [])}
+        if not any(samples.values()):
+            self.stdout.write(
+                'Замеров нет. Включена ли NOTES_INSTRUMENTATION?'
+            )
+            return
+        for view_name, view_samples in sorted(samples.items()):
+            if view_samples:
+                self.show(view_name, view_samples, options['no_histogram'])
+
+    def show(self, view_name, samples, no_histogram):
+        def column(metric):
+            return [sample[metric] for sample in samples]
+
+        total = [value * 1000 for value in column('total')]
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{view_name}: {len(samples)} запросов'
+        ))
+        self.stdout.write(
+            f'  total p50={percentile(total, 0.5):.1f} '
+            f'p95={percentile(total, 0.95):.1f} '
+            f'p99={percentile(total, 0.99):.1f} мс'
+        )
+        for metric in ('db', 'template', 'python'):
+            values = column(metric)
+            self.stdout.write(
+                f'  {metric} среднее={sum(values) / len(values) * 1000:.1f} мс'
+            )
+        queries = column('queries')
+        self.stdout.write(
+            f'  запросов к БД: среднее={sum(queries) / len(queries):.1f} '
+            f'максимум={max(queries)}'
+        )
+        if no_histogram:
+            return
+        counts = [0] * (len(BUCKETS) + 1)
+        for value in total:
+            index = next(
+                (i for i, bound in enumerate(BUCKETS) if value <= bound),
+                len(BUCKETS),
+            )
+            counts[index] += 1
+        labels = [f'<={bound}' for bound in BUCKETS] + [f'>{BUCKETS[-1]}']
+        top = max(counts)
+        for label, count in zip(labels, counts):
+            bar = '#' * round(count / top * BAR_WIDTH)
+            self.stdout.write(f'  {label:>6} мс | {bar} {count}')
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from notes.summary import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сводки заметок (число, объём, последнее изменение) '
+        'всех авторов или указанных по id заново по таблице заметок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('authors', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        summaries = rebuild_summaries(options['authors'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано сводок: {len(summaries)}.'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+from notes.search import index_notes
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает поисковый индекс заметок. Нужен один раз для '
+        'заметок, созданных до появления поиска; дальше индекс '
+        'обновляется при сохранении заметок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        indexed = last_id = 0
+        while True:
+            # Постранично по id, чтобы не держать в памяти все заметки.
+            batch = list(
+                Note.objects.filter(id__gt=last_id).order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            index_notes(batch)
+            indexed += len(batch)
+            last_id = batch[-1].pk
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано заметок: {indexed}.'
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+from notes.warmup import warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта. Кэш шаблонов у каждого процесса '
+        'свой, поэтому команда годится для проверки шаблонов перед '
+        'выкладкой; сами процессы компилируют их при запуске.'
+    )
+
+    def handle(self, *args, **options):
+        # Процесс уже прогрел шаблоны в NotesConfig.ready; сбрасываем
+        # кэш, чтобы читать и проверять их с диска.
+        for engine in engines.all():
+            if not isinstance(engine, DjangoTemplates):
+                continue
+            for loader in engine.engine.template_loaders:
+                if hasattr(loader, 'reset'):
+                    loader.reset()
+        start = time.perf_counter()
+        names = warm_templates()
+        elapsed = (time.perf_counter() - start) * 1000
+        for name in names:
+            self.stdout.write(name, self.style.SQL_FIELD)
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {len(names)} за {elapsed:.1f} мс'
+        ))
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.15 on 2026-10-18 03:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('notes', '0004_noteterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteChangeHorizon',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='auth.user')),
+                ('change_id', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NoteChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField()),
+                ('slug', models.SlugField(db_index=False, max_length=100)),
+                ('action', models.CharField(choices=[('C', 'Создана'), ('U', 'Изменена'), ('D', 'Удалена')], max_length=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notechange',
+            index=models.Index(fields=['author', 'id'], name='notes_change_author_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notechange',
+            index=models.Index(fields=['note_id', 'id'], name='notes_change_note_id_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.15 on 2026-10-18 03:31
+
+from django.db import migrations
+import notes.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_notechange'),
+    ]
+
+    # Тип колонки не меняется, поэтому меняем только состояние моделей:
+    # SQLite иначе пересоздал бы таблицу заметок целиком.
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='note',
+                name='text',
+                field=notes.fields.CompressibleTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+            ),
+        ]),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.15 on 2026-10-18 03:44
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+import django.db.models.deletion
+
+from notes.functions import OctetLength
+
+
+def fill_summaries(apps, schema_editor):
+    """Сводки для уже существующих пользователей и заметок."""
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Note = apps.get_model('notes', 'Note')
+    NoteSummary = apps.get_model('notes', 'NoteSummary')
+    summaries = {
+        pk: NoteSummary(author_id=pk)
+        for pk in User.objects.values_list('pk', flat=True)
+    }
+    rows = Note.objects.order_by().values('author_id').annotate(
+        count=Count('pk'),
+        size=Sum(OctetLength('text')),
+        edited_at=Max('updated_at'),
+    )
+    for row in rows:
+        summary = summaries[row['author_id']]
+        summary.notes_count = row['count']
+        summary.text_bytes = row['size'] or 0
+        summary.last_edited_at = row['edited_at']
+    NoteSummary.objects.bulk_create(summaries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('notes', '0006_note_text_compressible'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteSummary',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='auth.user')),
+                ('notes_count', models.PositiveIntegerField(default=0)),
+                ('text_bytes', models.PositiveBigIntegerField(default=0)),
+                ('last_edited_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
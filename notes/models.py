@@ -1,17 +1,23 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
 
-from pytils.translit import slugify
+from .fields import CompressibleTextField
+from .slugs import (
+    SlugConflict, is_slug_conflict, make_slug, slug_candidates,
+)
 
 
 class Note(models.Model):
+    # Поля, которых достаточно для вывода заметки в списке.
+    LIST_FIELDS = ('id', 'slug', 'title')
+
     title = models.CharField(
         'Заголовок',
         max_length=100,
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressibleTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -23,16 +29,175 @@ class Note(models.Model):
         help_text=('Укажите адрес для страницы заметки. Используйте только '
                    'латиницу, цифры, дефисы и знаки подчёркивания')
     )
+    updated_at = models.DateTimeField('Изменена', auto_now=True)
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Отдельный индекс не нужен: author идёт первым в составных.
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            # Список заметок автора: WHERE author_id = ? ORDER BY id.
+            models.Index(
+                fields=('author', 'id'), name='notes_note_author_id_idx'
+            ),
+            # Заметка автора по адресу: WHERE author_id = ? AND slug = ?.
+            models.Index(
+                fields=('author', 'slug'), name='notes_note_author_slug_idx'
+            ),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Сохраняет заметку, проверяя уникальность slug самой записью.
+
+        Заданный пользователем slug пробуется один раз, при конфликте
+        выбрасывается SlugConflict. Пустой slug формируется из заголовка,
+        при конфликте к нему добавляется суффикс -2, -3 и т.д.
+
+        Каждая попытка — транзакция (или точка сохранения), чтобы сводка
+        автора менялась вместе с заметкой.
+        """
+        requested_slug = self.slug
+        if requested_slug:
+            candidates = (requested_slug,)
+        else:
+            candidates = slug_candidates(
+                make_slug(self.title), self._meta.get_field('slug').max_length
+            )
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        for slug in candidates:
+            self.slug = slug
+            try:
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError as error:
+                if not is_slug_conflict(error, self, using):
+                    raise
+        self.slug = requested_slug
+        raise SlugConflict(requested_slug or slug)
+
+
+class NoteTerm(models.Model):
+    """Запись обратного индекса: слово и его вес в заметке."""
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name='terms'
+    )
+    # Дублирует note.author, чтобы искать без соединения таблиц.
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+    )
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'term'), name='notes_noteterm_note_term_uniq'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('author', 'term'), name='notes_noteterm_author_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.term
+
+
+class NoteChange(models.Model):
+    """
+    Запись журнала изменений заметок для синхронизации клиентов.
+
+    id служит курсором ленты изменений автора. Записи одного автора
+    добавляются по очереди (notes.changes._append), поэтому запись с
+    большим id становится видна не раньше записи с меньшим. Между
+    авторами такого порядка нет: курсор годится только для своей ленты.
+    Запись об удалении остаётся после удаления самой заметки.
+    """
+    CREATED = 'C'
+    UPDATED = 'U'
+    DELETED = 'D'
+    ACTIONS = (
+        (CREATED, 'Создана'),
+        (UPDATED, 'Изменена'),
+        (DELETED, 'Удалена'),
+    )
+
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+    )
+    # Не внешний ключ: заметки уже может не быть.
+    note_id = models.BigIntegerField()
+    slug = models.SlugField(max_length=100, db_index=False)
+    action = models.CharField(max_length=1, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            # Лента автора: WHERE author_id = ? AND id > ? ORDER BY id.
+            models.Index(
+                fields=('author', 'id'), name='notes_change_author_id_idx'
+            ),
+            # Сжатие журнала: более поздние записи той же заметки.
+            models.Index(
+                fields=('note_id', 'id'), name='notes_change_note_id_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.action} {self.slug}'
+
+
+class NoteChangeHorizon(models.Model):
+    """
+    Граница сжатого журнала автора: записи с id не больше change_id
+    удалены, и клиент с более старым курсором должен синхронизироваться
+    заново.
+    """
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    change_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.change_id)
+
+
+class NoteSummary(models.Model):
+    """
+    Сводка заметок автора для шапки страниц: число заметок, их объём
+    в БД и время последнего изменения. Меняется в той же транзакции,
+    что и заметки, поэтому страницам не нужен COUNT(*) по заметкам.
+    """
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    notes_count = models.PositiveIntegerField(default=0)
+    # Как тексты хранятся в БД, то есть после сжатия.
+    text_bytes = models.PositiveBigIntegerField(default=0)
+    last_edited_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return str(self.notes_count)
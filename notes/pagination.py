@@ -0,0 +1,141 @@
+import base64
+import binascii
+from functools import partial
+
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(Exception):
+    """Курсор страницы повреждён или подделан."""
+
+
+def encode_cursor(direction, value):
+    """Упаковывает направление и значение ключа в непрозрачную строку."""
+    raw = f'{direction}{value}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор, возвращает пару (направление, значение)."""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode()
+        direction, value = raw[0], int(raw[1:])
+    except (binascii.Error, UnicodeDecodeError, ValueError, IndexError):
+        raise InvalidCursor(cursor)
+    if direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor(cursor)
+    return direction, value
+
+
+class KeysetPage:
+    """
+    Страница, полученная по курсору.
+
+    Запрос к БД выполняется при первом обращении к записям или курсорам,
+    поэтому страницу можно положить в контекст шаблона заранее, а
+    закэшированный фрагмент шаблона обойдётся без запроса.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    @cached_property
+    def _result(self):
+        return self._loader()
+
+    @property
+    def object_list(self):
+        return self._result[0]
+
+    @property
+    def next_cursor(self):
+        return self._result[1]
+
+    @property
+    def previous_cursor(self):
+        return self._result[2]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу (keyset), а не через OFFSET.
+
+    Сортировка задаётся кортежем ordering, курсор хранит значение
+    последнего поля. Все предшествующие поля сортировки должны быть
+    зафиксированы фильтром queryset (например, author=request.user),
+    тогда каждая страница — это поиск по индексу с LIMIT, и её
+    стоимость не зависит от того, насколько далеко листает пользователь.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('id',)):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+        self.key = ordering[-1]
+
+    def page(self, cursor=None):
+        """
+        Возвращает страницу по курсору из адреса или первую страницу.
+
+        Курсор проверяется сразу, а записи читаются лениво.
+        """
+        if not cursor:
+            return KeysetPage(partial(
+                self._forward, self.queryset, has_previous=False
+            ))
+        direction, value = decode_cursor(cursor)
+        if direction == NEXT:
+            queryset = self.queryset.filter(**{f'{self.key}__gt': value})
+            return KeysetPage(partial(
+                self._forward, queryset, has_previous=True
+            ))
+        queryset = self.queryset.filter(**{f'{self.key}__lt': value})
+        return KeysetPage(partial(self._backward, queryset))
+
+    def _fetch(self, queryset, ordering):
+        # Берём на одну запись больше, чтобы узнать, есть ли продолжение.
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        return rows[:self.per_page], len(rows) > self.per_page
+
+    def _cursor(self, direction, obj):
+        return encode_cursor(direction, getattr(obj, self.key))
+
+    def _forward(self, queryset, has_previous):
+        rows, has_next = self._fetch(queryset, self.ordering)
+        return (
+            rows,
+            self._cursor(NEXT, rows[-1]) if has_next else None,
+            self._cursor(PREVIOUS, rows[0]) if has_previous and rows else None,
+        )
+
+    def _backward(self, queryset):
+        reverse = [f'-{field}' for field in self.ordering]
+        rows, has_previous = self._fetch(queryset, reverse)
+        rows.reverse()
+        return (
+            rows,
+            self._cursor(NEXT, rows[-1]) if rows else None,
+            self._cursor(PREVIOUS, rows[0]) if has_previous else None,
+        )
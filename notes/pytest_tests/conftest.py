@@ -1,13 +1,36 @@
 # conftest.py
+from functools import partial
+
 import pytest
 
+from asgiref.sync import sync_to_async
+
 # Импортируем класс клиента.
 from django.test.client import Client
 
+from django.core.cache import cache
+
+from notes import async_views
 # Импортируем модель заметки, чтобы создать экземпляр.
 from notes.models import Note
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # БД после каждого теста откатывается, а кэш — нет.
+    cache.clear()
+
+
+@pytest.fixture
+def sync_db_thread(monkeypatch):
+    # Асинхронные представления ходят в БД из пула потоков, а
+    # CaptureQueriesContext видит только соединение текущего потока.
+    monkeypatch.setattr(
+        async_views, 'in_db_thread',
+        partial(sync_to_async, thread_sensitive=True),
+    )
+
+
 @pytest.fixture
 # Используем встроенную фикстуру для модели пользователей django_user_model.
 def author(django_user_model):
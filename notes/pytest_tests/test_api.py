@@ -0,0 +1,135 @@
+# test_api.py
+# JSON API: список по курсору, выбор полей, пакетное чтение и since.
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.models import Note
+
+
+@pytest.fixture
+def notes(author, not_author):
+    notes = [
+        Note.objects.create(
+            title=f'Заметка {index}', text=f'Текст {index}',
+            slug=f'note-{index}', author=author,
+        )
+        for index in range(5)
+    ]
+    Note.objects.create(
+        title='Чужая', text='Текст', slug='alien', author=not_author
+    )
+    return notes
+
+
+def test_anonymous_gets_401(client):
+    response = client.get(reverse('api:list'))
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_list_pages(author_client, notes, settings):
+    settings.NOTES_PAGE_SIZE = 2
+    url = reverse('api:list')
+    slugs, cursor = [], None
+    while True:
+        data = author_client.get(
+            url, {'cursor': cursor} if cursor else {}
+        ).json()
+        slugs += [note['slug'] for note in data['results']]
+        cursor = data['next']
+        if cursor is None:
+            break
+    assert slugs == [note.slug for note in notes]
+
+
+def test_list_sparse_fields(author_client, notes):
+    data = author_client.get(
+        reverse('api:list'), {'fields': 'title,slug'}
+    ).json()
+    assert data['results'][0] == {'slug': 'note-0', 'title': 'Заметка 0'}
+
+
+def test_unknown_field(author_client):
+    response = author_client.get(reverse('api:list'), {'fields': 'author'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_invalid_cursor(author_client):
+    response = author_client.get(reverse('api:list'), {'cursor': '!!'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_since(author_client, notes, settings):
+    settings.NOTES_API_SINCE_MARGIN = 0
+    timestamp = author_client.get(reverse('api:list')).json()['timestamp']
+    Note.objects.filter(pk=notes[2].pk).update(
+        updated_at=timezone.now() + timedelta(seconds=1)
+    )
+    data = author_client.get(
+        reverse('api:list'), {'since': timestamp, 'fields': 'slug'}
+    ).json()
+    assert data['results'] == [{'slug': 'note-2'}]
+
+
+def test_since_covers_late_commits(author_client, notes, settings):
+    settings.NOTES_API_SINCE_MARGIN = 60
+    timestamp = author_client.get(reverse('api:list')).json()['timestamp']
+    # Транзакция началась до ответа, а закоммичена после него.
+    Note.objects.filter(pk=notes[2].pk).update(
+        updated_at=timezone.now() - timedelta(seconds=30)
+    )
+    Note.objects.exclude(pk=notes[2].pk).update(
+        updated_at=timezone.now() - timedelta(seconds=120)
+    )
+    data = author_client.get(
+        reverse('api:list'), {'since': timestamp, 'fields': 'slug'}
+    ).json()
+    assert data['results'] == [{'slug': 'note-2'}]
+
+
+@pytest.mark.parametrize('since', ('вчера', '2024-13-45T00:00:00'))
+def test_invalid_since(author_client, since):
+    response = author_client.get(reverse('api:list'), {'since': since})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_batch(author_client, notes):
+    data = author_client.get(reverse('api:batch'), {
+        'slug': ['note-3', 'alien', 'note-1', 'missing'], 'fields': 'text',
+    }).json()
+    assert data == {
+        'results': [{'text': 'Текст 3'}, {'text': 'Текст 1'}],
+        'missing': ['alien', 'missing'],
+    }
+
+
+def test_batch_limit(author_client, settings):
+    settings.NOTES_API_BATCH_MAX = 2
+    response = author_client.get(
+        reverse('api:batch'), {'slug': ['a', 'b', 'c']}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_detail(author_client, notes):
+    response = author_client.get(reverse('api:detail', args=('note-1',)))
+    assert response.json()['title'] == 'Заметка 1'
+    response = author_client.get(reverse('api:detail', args=('alien',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_not_modified_until_notes_change(
+        author_client, notes, django_capture_on_commit_callbacks
+):
+    url = reverse('api:list')
+    etag = author_client.get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    with django_capture_on_commit_callbacks(execute=True):
+        notes[0].save()
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
@@ -0,0 +1,115 @@
+# test_async_views.py
+# Асинхронные представления работают с БД из пула потоков, поэтому
+# тестам нужны данные, закоммиченные в БД, а не в транзакции теста.
+import threading
+from http import HTTPStatus
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from django.urls import reverse
+from pytest_django.asserts import assertRedirects
+
+from notes import async_views
+from notes.models import Note
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.mark.parametrize('name', ('notes_async:list', 'notes_async:add'))
+def test_pages_availability_for_auth_user(author_client, name):
+    response = author_client.get(reverse(name))
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.fixture
+def parametrized_client(request):
+    # Клиент по имени фикстуры: без pytest-lazy-fixture модуль
+    # импортируется и при запуске через manage.py test.
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        ('not_author_client', HTTPStatus.NOT_FOUND),
+        ('author_client', HTTPStatus.OK),
+    ),
+    indirect=['parametrized_client'],
+)
+@pytest.mark.parametrize(
+    'name',
+    ('notes_async:detail', 'notes_async:edit', 'notes_async:delete'),
+)
+def test_pages_availability_for_different_users(
+        parametrized_client, name, note, expected_status
+):
+    response = parametrized_client.get(reverse(name, args=(note.slug,)))
+    assert response.status_code == expected_status
+
+
+def test_anonymous_is_redirected(client):
+    url = reverse('notes_async:list')
+    response = client.get(url)
+    assertRedirects(response, f"{reverse('users:login')}?next={url}")
+
+
+def test_list_contains_only_author_notes(
+        author_client, not_author_client, note
+):
+    url = reverse('notes_async:list')
+    assert note in author_client.get(url).context['object_list']
+    assert note not in not_author_client.get(url).context['object_list']
+
+
+def test_detail_not_modified(author_client, note):
+    url = reverse('notes_async:detail', args=(note.slug,))
+    etag = author_client.get(url)['ETag']
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_create_edit_delete(author_client, author, form_data):
+    response = author_client.post(reverse('notes_async:add'), form_data)
+    assertRedirects(response, reverse('notes:success'))
+    note = Note.objects.get()
+    assert (note.title, note.author) == (form_data['title'], author)
+
+    form_data['title'] = 'Другой заголовок'
+    url = reverse('notes_async:edit', args=(note.slug,))
+    assertRedirects(
+        author_client.post(url, form_data), reverse('notes:success')
+    )
+    note.refresh_from_db()
+    assert note.title == 'Другой заголовок'
+
+    url = reverse('notes_async:delete', args=(note.slug,))
+    assertRedirects(author_client.post(url), reverse('notes:success'))
+    assert Note.objects.count() == 0
+
+
+def test_create_with_taken_slug(author_client, note, form_data):
+    form_data['slug'] = note.slug
+    response = author_client.post(reverse('notes_async:add'), form_data)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['form'].errors['slug']
+    assert Note.objects.count() == 1
+
+
+def test_db_thread_closes_stale_connections(monkeypatch):
+    # Поток пула не видит сигналов запроса: устаревшие соединения
+    # закрываются вокруг каждой работы с БД в том же потоке.
+    calls = []
+    monkeypatch.setattr(
+        async_views, 'close_old_connections',
+        lambda: calls.append(('close', threading.get_ident())),
+    )
+
+    def work():
+        calls.append(('work', threading.get_ident()))
+        return Note.objects.count()
+
+    assert async_to_sync(async_views.in_db_thread(work))() == 0
+    assert [name for name, _ in calls] == ['close', 'work', 'close']
+    assert len({thread for _, thread in calls}) == 1
+    assert calls[0][1] != threading.get_ident()
@@ -0,0 +1,77 @@
+# test_auth_cache.py
+# В профилях cached и signed_cookies ни сессия, ни пользователь
+# не читаются из БД на каждом запросе.
+import pytest
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.backends import user_cache_key
+
+CACHED_BACKEND = 'notes.backends.CachedModelBackend'
+PROFILES = {
+    'db': ('django.contrib.sessions.backends.db',
+           'django.contrib.auth.backends.ModelBackend'),
+    'cached': ('django.contrib.sessions.backends.cached_db', CACHED_BACKEND),
+    'signed_cookies': ('django.contrib.sessions.backends.signed_cookies',
+                       CACHED_BACKEND),
+}
+URLS = (
+    ('notes:list', False),
+    ('notes:add', False),
+    ('notes:success', False),
+    ('notes:detail', True),
+    ('notes:edit', True),
+)
+
+
+def use_profile(settings, profile):
+    engine, backend = PROFILES[profile]
+    settings.SESSION_ENGINE = engine
+    settings.AUTHENTICATION_BACKENDS = [backend]
+
+
+def count_queries(settings, profile, author, url):
+    use_profile(settings, profile)
+    client = Client()
+    client.force_login(author)
+    # Первый запрос прогревает кэши, считаем второй.
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    return len(context)
+
+
+@pytest.mark.parametrize('profile', ('cached', 'signed_cookies'))
+@pytest.mark.parametrize('name, with_slug', URLS)
+def test_cached_profile_saves_two_queries(
+        settings, author, note, profile, name, with_slug
+):
+    url = reverse(name, args=(note.slug,) if with_slug else None)
+    baseline = count_queries(settings, 'db', author, url)
+    assert count_queries(settings, profile, author, url) == baseline - 2
+
+
+def test_password_change_invalidates_cached_user(settings, author):
+    use_profile(settings, 'signed_cookies')
+    client = Client()
+    client.force_login(author)
+    client.get(reverse('notes:list'))
+    author.set_password('новый-пароль-123')
+    author.save()
+    # Хэш сессии больше не совпадает: пользователь разлогинен.
+    response = client.get(reverse('notes:list'))
+    assert response.status_code == 302
+
+
+def test_logout_forgets_cached_user(settings, author):
+    use_profile(settings, 'cached')
+    client = Client()
+    client.force_login(author)
+    client.get(reverse('notes:list'))
+    assert cache.get(user_cache_key(author.pk)) is not None
+    client.get(reverse('users:logout'))
+    assert cache.get(user_cache_key(author.pk)) is None
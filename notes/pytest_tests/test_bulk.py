@@ -0,0 +1,129 @@
+# test_bulk.py
+# Удаление и изменение нескольких заметок одним запросом.
+from http import HTTPStatus
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.search import search_notes
+
+URL = reverse('notes:bulk')
+
+
+@pytest.fixture
+def notes(author, not_author):
+    return [
+        Note.objects.create(
+            title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+            author=author,
+        )
+        for index in range(3)
+    ] + [
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='alien', author=not_author,
+        )
+    ]
+
+
+def post_json(client, data):
+    return client.post(URL, data, HTTP_ACCEPT='application/json')
+
+
+def test_bulk_delete_by_slug(author_client, notes):
+    response = post_json(author_client, {
+        'action': 'delete', 'notes': ['note-0', 'alien', 'missing'],
+    })
+    assert response.json() == {'results': [
+        {'note': 'note-0', 'status': 'deleted'},
+        {'note': 'alien', 'status': 'not_found'},
+        {'note': 'missing', 'status': 'not_found'},
+    ]}
+    assert set(Note.objects.values_list('slug', flat=True)) == {
+        'note-1', 'note-2', 'alien'
+    }
+
+
+def test_bulk_delete_by_id(author_client, notes):
+    response = post_json(author_client, {
+        'action': 'delete', 'ids': [notes[1].pk, notes[3].pk],
+    })
+    assert response.json()['results'] == [
+        {'note': notes[1].pk, 'status': 'deleted'},
+        {'note': notes[3].pk, 'status': 'not_found'},
+    ]
+    assert Note.objects.count() == 3
+
+
+def test_bulk_update(author, author_client, notes):
+    response = post_json(author_client, {
+        'action': 'update', 'notes': ['note-0', 'note-1'],
+        'title': 'Кошки',
+    })
+    assert response.status_code == HTTPStatus.OK
+    assert list(
+        Note.objects.filter(title='Кошки').values_list('slug', flat=True)
+        .order_by('slug')
+    ) == ['note-0', 'note-1']
+    assert [row['slug'] for row in search_notes(author, 'кошки')] == [
+        'note-0', 'note-1'
+    ]
+
+
+def test_bulk_update_refreshes_cached_list(
+        author_client, notes, django_capture_on_commit_callbacks
+):
+    author_client.get(reverse('notes:list'))
+    with django_capture_on_commit_callbacks(execute=True):
+        post_json(author_client, {
+            'action': 'update', 'notes': ['note-0'], 'title': 'Новый',
+        })
+    response = author_client.get(reverse('notes:list'))
+    assert 'Новый' in response.content.decode()
+
+
+def test_bulk_update_requires_changes(author_client, notes):
+    response = post_json(
+        author_client, {'action': 'update', 'notes': ['note-0']}
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert '__all__' in response.json()['errors']
+
+
+def test_bulk_requires_notes(author_client):
+    response = author_client.post(URL, {'action': 'delete'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_bulk_html_response(author_client, notes):
+    response = author_client.post(
+        URL, {'action': 'delete', 'notes': ['note-0']}
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'удалена' in response.content.decode()
+
+
+def test_bulk_delete_query_count_is_constant(author, author_client):
+    def delete(count):
+        Note.objects.bulk_create(
+            Note(title='З', text='Т', slug=f'n-{count}-{i}', author=author)
+            for i in range(count)
+        )
+        with CaptureQueriesContext(connection) as captured:
+            post_json(author_client, {
+                'action': 'delete',
+                'notes': [f'n-{count}-{i}' for i in range(count)],
+            })
+        return len(captured)
+
+    assert delete(1) == delete(50)
+
+
+def test_list_has_checkboxes(author_client, notes):
+    response = author_client.get(reverse('notes:list'))
+    content = response.content.decode()
+    assert 'name="notes" value="note-0"' in content
+    assert 'csrfmiddlewaretoken' in content
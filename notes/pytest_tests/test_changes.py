@@ -0,0 +1,152 @@
+# test_changes.py
+# Журнал изменений заметок и лента для синхронизации клиентов.
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.models import Note, NoteChange
+
+URL = reverse('api:changes')
+
+
+def feed(client, cursor, **params):
+    return client.get(URL, {'cursor': cursor, **params})
+
+
+@pytest.fixture
+def start(author_client):
+    return author_client.get(URL).json()['cursor']
+
+
+def test_feed_records_create_update_delete(author, author_client, start):
+    note = Note.objects.create(
+        title='Заголовок', text='Текст', slug='synced', author=author
+    )
+    note.title = 'Новый заголовок'
+    note.save()
+    data = feed(author_client, start, fields='title').json()
+    assert [
+        (change['action'], change['note']) for change in data['changes']
+    ] == [
+        ('created', {'title': 'Новый заголовок'}),
+        ('updated', {'title': 'Новый заголовок'}),
+    ]
+    note_id = note.pk
+    note.delete()
+    data = feed(author_client, data['cursor']).json()
+    assert data['changes'] == [{
+        'id': data['cursor'], 'action': 'deleted', 'note_id': note_id,
+        'slug': 'synced', 'note': None,
+    }]
+
+
+def test_appends_are_serialized_per_author(author):
+    # Запись журнала вставляется только под блокировкой строки сводки
+    # автора: иначе записи с меньшим id могли бы стать видны позже.
+    with CaptureQueriesContext(connection) as context:
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='locked', author=author
+        )
+    queries = [query['sql'] for query in context.captured_queries]
+    lock = next(
+        index for index, sql in enumerate(queries)
+        if sql.startswith('SELECT') and 'notes_notesummary' in sql
+    )
+    insert = next(
+        index for index, sql in enumerate(queries)
+        if sql.startswith('INSERT INTO "notes_notechange"')
+    )
+    assert lock < insert
+    if connection.features.has_select_for_update:
+        assert 'FOR UPDATE' in queries[lock]
+
+
+def test_feed_is_per_author(not_author, author_client, start):
+    Note.objects.create(title='Чужая', text='Текст', author=not_author)
+    assert feed(author_client, start).json()['changes'] == []
+
+
+def test_feed_pages(author, author_client, start, settings):
+    settings.NOTES_CHANGES_PAGE_SIZE = 2
+    for index in range(3):
+        Note.objects.create(title=f'Заметка {index}', text='Т', author=author)
+    first = feed(author_client, start).json()
+    assert first['has_more'] is True
+    second = feed(author_client, first['cursor']).json()
+    assert second['has_more'] is False
+    assert len(first['changes'] + second['changes']) == 3
+
+
+def test_invalid_cursor(author_client):
+    response = feed(author_client, 'abc')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_bulk_delete_writes_tombstones(author, author_client):
+    for index in range(3):
+        Note.objects.create(
+            title='Т', text='Т', slug=f'bulk-{index}', author=author
+        )
+    author_client.post(reverse('notes:bulk'), {
+        'action': 'delete', 'notes': ['bulk-0', 'bulk-1', 'bulk-2'],
+    })
+    assert NoteChange.objects.filter(
+        action=NoteChange.DELETED
+    ).count() == 3
+
+
+def test_imported_notes_are_logged(author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text('{"title": "Кошки", "text": "Текст"}', encoding='utf-8')
+    call_command('import_notes', str(path), author=author.username)
+    assert NoteChange.objects.get().action == NoteChange.CREATED
+
+
+def test_compaction_keeps_latest_change(author, author_client, start):
+    note = Note.objects.create(title='Т', text='Т', author=author)
+    note.save()
+    note.save()
+    call_command('compact_note_changes', stdout=StringIO())
+    changes = feed(author_client, start).json()['changes']
+    assert [change['action'] for change in changes] == ['updated']
+
+
+def test_compaction_horizon_gives_gone(author, author_client, start):
+    Note.objects.create(title='Т', text='Т', author=author)
+    NoteChange.objects.update(created_at=timezone.now() - timedelta(days=60))
+    out = StringIO()
+    call_command('compact_note_changes', days=30, stdout=out)
+    assert 'устаревших 1' in out.getvalue()
+    response = feed(author_client, start)
+    assert response.status_code == HTTPStatus.GONE
+    latest = author_client.get(URL).json()['cursor']
+    assert feed(author_client, response.json()['horizon']).status_code == (
+        HTTPStatus.OK
+    )
+    assert latest == response.json()['horizon']
+
+
+def test_delete_author_with_notes(author, not_author):
+    note = Note.objects.create(
+        title='Заголовок', text='Текст', slug='doomed', author=author
+    )
+    other = Note.objects.create(
+        title='Заголовок', text='Текст', slug='kept', author=not_author
+    )
+    author_id, other_id = author.pk, other.pk
+    author.delete()
+    assert not Note.objects.filter(pk=note.pk).exists()
+    assert not NoteChange.objects.filter(author_id=author_id).exists()
+    # Журнал остальных авторов ведётся по-прежнему.
+    other.delete()
+    assert NoteChange.objects.filter(
+        note_id=other_id, action=NoteChange.DELETED
+    ).exists()
@@ -0,0 +1,78 @@
+# test_commands.py
+import json
+
+import pytest
+
+from django.core.management import CommandError, call_command
+
+from notes.models import Note
+
+
+@pytest.mark.parametrize('fmt', ('jsonl', 'csv'))
+def test_export_import_round_trip(note, author, tmp_path, fmt):
+    path = tmp_path / f'notes.{fmt}'
+    call_command('export_notes', str(path))
+    Note.objects.all().delete()
+    call_command('import_notes', str(path), batch_size=1)
+    imported = Note.objects.get()
+    assert (imported.title, imported.text, imported.slug) == (
+        note.title, note.text, note.slug
+    )
+    assert imported.author == author
+
+
+def test_import_allocates_free_slugs(note, author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    rows = [
+        # Адрес уже занят заметкой из фикстуры.
+        {'title': 'Первая', 'text': 'Текст', 'slug': note.slug},
+        # Две заметки без адреса с одинаковым заголовком в одной пачке.
+        {'title': 'Заголовок', 'text': 'Текст'},
+        {'title': 'Заголовок', 'text': 'Текст'},
+    ]
+    path.write_text(
+        '\n'.join(json.dumps(row, ensure_ascii=False) for row in rows),
+        encoding='utf-8',
+    )
+    call_command('import_notes', str(path), author=author.username)
+    assert set(Note.objects.values_list('slug', flat=True)) == {
+        note.slug, f'{note.slug}-2', 'zagolovok', 'zagolovok-2'
+    }
+
+
+def test_import_skips_taken_slugs(note, author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(json.dumps({'title': 'Первая', 'slug': note.slug}))
+    call_command(
+        'import_notes', str(path), author=author.username,
+        on_conflict='skip',
+    )
+    assert Note.objects.count() == 1
+
+
+def test_import_renames_slug_taken_during_import(
+    note, author, tmp_path, monkeypatch
+):
+    from notes.management.commands import import_notes
+
+    def allocate_slugs(notes, queryset, rename=True):
+        failed = real_allocate(notes, queryset, rename)
+        # Пока пачка готовилась, адрес заняли параллельно.
+        Note.objects.create(
+            title='Чужая', text='Текст', slug=notes[0].slug, author=author
+        )
+        return failed
+
+    real_allocate = import_notes.allocate_slugs
+    monkeypatch.setattr(import_notes, 'allocate_slugs', allocate_slugs)
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(json.dumps({'title': 'Первая', 'slug': 'moya'}))
+    call_command('import_notes', str(path), author=author.username)
+    assert Note.objects.filter(title='Первая').get().slug == 'moya-2'
+
+
+def test_import_rejects_empty_batches(author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(json.dumps({'title': 'Первая'}))
+    with pytest.raises(CommandError):
+        call_command('import_notes', str(path), batch_size=0)
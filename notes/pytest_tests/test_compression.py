@@ -0,0 +1,89 @@
+# test_compression.py
+# Длинные тексты заметок хранятся сжатыми и прозрачно распаковываются.
+import base64
+import os
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db.models import ExpressionWrapper, F, TextField
+
+from notes.fields import MARKER
+from notes.models import Note
+from notes.search import search_notes
+
+LONG_TEXT = 'Строка журнала: запрос обработан за 15 мс.\n' * 500
+
+
+def stored_text(note):
+    """Текст заметки в том виде, в каком он лежит в БД."""
+    return Note.objects.annotate(
+        stored=ExpressionWrapper(F('text'), output_field=TextField())
+    ).values_list('stored', flat=True).get(pk=note.pk)
+
+
+@pytest.fixture
+def make_note(author):
+    def make_note(text, slug='note'):
+        return Note.objects.create(
+            title='Журнал', text=text, slug=slug, author=author
+        )
+    return make_note
+
+
+def test_long_text_is_compressed(make_note):
+    note = make_note(LONG_TEXT)
+    stored = stored_text(note)
+    assert stored.startswith(MARKER)
+    assert len(stored) < len(LONG_TEXT.encode()) / 10
+    assert Note.objects.get(pk=note.pk).text == LONG_TEXT
+
+
+def test_short_text_is_plain(make_note):
+    note = make_note('Короткий текст')
+    assert stored_text(note) == 'Короткий текст'
+
+
+def test_incompressible_text_is_plain(make_note):
+    text = base64.b64encode(os.urandom(4096)).decode()
+    assert stored_text(make_note(text)) == text
+
+
+def test_text_starting_with_marker_round_trips(make_note):
+    text = MARKER + 'не сжатый текст'
+    note = make_note(text)
+    assert stored_text(note).startswith(MARKER)
+    assert Note.objects.get(pk=note.pk).text == text
+
+
+def test_compressed_notes_are_searchable(author, make_note):
+    make_note(LONG_TEXT + ' квитанция')
+    assert [row['slug'] for row in search_notes(author, 'квитанция')] == [
+        'note'
+    ]
+
+
+def test_disabled_compression_still_reads(make_note, settings):
+    note = make_note(LONG_TEXT)
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 0
+    assert Note.objects.get(pk=note.pk).text == LONG_TEXT
+    plain = make_note(LONG_TEXT, slug='plain')
+    assert stored_text(plain) == LONG_TEXT
+
+
+def test_compress_notes_command(make_note, settings):
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 0
+    notes = [make_note(LONG_TEXT, slug=f'note-{i}') for i in range(3)]
+    short = make_note('Короткий', slug='short')
+    updated_at = Note.objects.get(pk=notes[0].pk).updated_at
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 4096
+    out = StringIO()
+    call_command('compress_notes', batch_size=2, stdout=out)
+    assert 'Изменено заметок: 3' in out.getvalue()
+    assert all(stored_text(note).startswith(MARKER) for note in notes)
+    assert stored_text(short) == 'Короткий'
+    assert Note.objects.get(pk=notes[0].pk).updated_at == updated_at
+
+    call_command('compress_notes', decompress=True, stdout=StringIO())
+    assert all(stored_text(note) == LONG_TEXT for note in notes)
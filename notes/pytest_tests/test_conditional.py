@@ -0,0 +1,69 @@
+# test_conditional.py
+# Повторный запрос с If-None-Match получает 304, пока заметки не менялись.
+from http import HTTPStatus
+
+import pytest
+
+from django.urls import reverse
+
+from notes.models import Note
+
+
+@pytest.fixture
+def detail_url(slug_for_args):
+    return reverse('notes:detail', args=slug_for_args)
+
+
+def revalidate(client, url):
+    etag = client.get(url)['ETag']
+    return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+def test_detail_not_modified(author_client, detail_url):
+    response = revalidate(author_client, detail_url)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_last_modified(author_client, detail_url):
+    last_modified = author_client.get(detail_url)['Last-Modified']
+    response = author_client.get(
+        detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_detail_modified_after_edit(author_client, note, detail_url):
+    etag = author_client.get(detail_url)['ETag']
+    note.text = 'Другой текст'
+    note.save()
+    response = author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_detail_etag_is_per_user(
+        author_client, not_author_client, detail_url
+):
+    etag = author_client.get(detail_url)['ETag']
+    response = not_author_client.get(detail_url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_list_not_modified(author_client, note):
+    response = revalidate(author_client, reverse('notes:list'))
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_list_modified_after_create(
+        author_client, author, note, django_capture_on_commit_callbacks
+):
+    url = reverse('notes:list')
+    etag = author_client.get(url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        Note.objects.create(title='Новая', text='Текст', author=author)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_anonymous_is_redirected(client, detail_url):
+    response = client.get(detail_url, HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == HTTPStatus.FOUND
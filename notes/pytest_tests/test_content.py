@@ -1,9 +1,12 @@
 # test_content.py
+from http import HTTPStatus
+
 import pytest
 
 from django.urls import reverse
 # Импортируем класс формы.
 from notes.forms import NoteForm
+from notes.models import Note
 
 
 @pytest.mark.parametrize(
@@ -97,3 +100,53 @@ def test_pages_contains_form(author_client, name, args):
 #     object_list = response.context['object_list']
 #     # Проверяем, что заметки нет в контексте страницы:
 #     assert note not in object_list
+
+
+@pytest.fixture
+def many_notes(author):
+    # Пять заметок автора для проверки постраничного вывода.
+    return [
+        Note.objects.create(
+            title=f'Заметка {index}', text='Текст',
+            slug=f'note-{index}', author=author,
+        )
+        for index in range(5)
+    ]
+
+
+def test_notes_list_is_paginated_by_cursor(
+        author_client, many_notes, settings
+):
+    settings.NOTES_PAGE_SIZE = 2
+    url = reverse('notes:list')
+    # Первая страница: назад листать некуда.
+    page = author_client.get(url).context['page_obj']
+    assert list(page) == many_notes[:2]
+    assert not page.has_previous()
+    # Идём вперёд до последней страницы.
+    page = author_client.get(
+        url, {'cursor': page.next_cursor}
+    ).context['page_obj']
+    assert list(page) == many_notes[2:4]
+    page = author_client.get(
+        url, {'cursor': page.next_cursor}
+    ).context['page_obj']
+    assert list(page) == many_notes[4:]
+    assert not page.has_next()
+    # И обратно.
+    page = author_client.get(
+        url, {'cursor': page.previous_cursor}
+    ).context['page_obj']
+    assert list(page) == many_notes[2:4]
+
+
+def test_notes_list_invalid_cursor(author_client):
+    response = author_client.get(reverse('notes:list'), {'cursor': '!!!'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_notes_list_does_not_load_text(author_client, note):
+    response = author_client.get(reverse('notes:list'))
+    # Текст заметки в список не попадает и из БД не читается.
+    listed_note = response.context['object_list'][0]
+    assert 'text' in listed_note.get_deferred_fields()
@@ -0,0 +1,21 @@
+# test_db_profile.py
+import pytest
+
+from django.conf import settings
+from django.db import connection
+
+pytestmark = pytest.mark.skipif(
+    settings.DATABASES['default']['ENGINE'] != 'yanote.backends.sqlite3',
+    reason='PRAGMA выполняются только в профиле sqlite.',
+)
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_are_applied():
+    pragmas = settings.DATABASES['default']['OPTIONS']['pragmas']
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        # NORMAL == 1.
+        assert cursor.fetchone()[0] == 1
+        cursor.execute('PRAGMA cache_size')
+        assert cursor.fetchone()[0] == pragmas['cache_size']
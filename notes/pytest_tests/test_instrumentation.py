@@ -0,0 +1,77 @@
+# test_instrumentation.py
+# Замеры страниц заметок: заголовок Server-Timing и команда notes_timings.
+import json
+import logging
+import re
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.instrumentation import store
+
+
+@pytest.fixture
+def instrumented(settings):
+    settings.NOTES_INSTRUMENTATION = True
+    # Сохраняем замеры в кэш после каждого запроса.
+    settings.NOTES_INSTRUMENTATION_FLUSH = 0
+    store.samples.clear()
+    yield
+    store.samples.clear()
+
+
+def test_disabled_by_default(author_client, note):
+    response = author_client.get(reverse('notes:list'))
+    assert 'Server-Timing' not in response
+
+
+def test_server_timing_header(instrumented, author_client, note):
+    response = author_client.get(reverse('notes:list'))
+    timing = response['Server-Timing']
+    for metric in ('db;', 'tpl;', 'app;', 'total;'):
+        assert metric in timing
+    assert 'queries"' in timing
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_view_queries_are_measured(instrumented, author_client, note):
+    # Асинхронное представление ходит в БД из потоков пула.
+    response = author_client.get(reverse('notes_async:list'))
+    queries = re.search(r'"(\d+) queries"', response['Server-Timing'])
+    assert int(queries.group(1)) > 0
+
+
+def test_other_apps_not_measured(instrumented, client):
+    response = client.get(reverse('users:login'))
+    assert 'Server-Timing' not in response
+
+
+def test_log_line(instrumented, author_client, note, caplog):
+    logger = logging.getLogger('notes.instrumentation')
+    logger.propagate = True
+    try:
+        with caplog.at_level(logging.INFO, 'notes.instrumentation'):
+            author_client.get(reverse('notes:detail', args=(note.slug,)))
+    finally:
+        logger.propagate = False
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'notes:detail'
+    assert record['status'] == 200
+    assert record['queries'] > 0
+
+
+def test_timings_command(instrumented, author_client, note):
+    for _ in range(3):
+        author_client.get(reverse('notes:list'))
+    out = StringIO()
+    call_command('notes_timings', stdout=out)
+    assert 'notes:list: 3 запросов' in out.getvalue()
+
+
+def test_timings_command_without_samples():
+    out = StringIO()
+    call_command('notes_timings', stdout=out)
+    assert 'Замеров нет' in out.getvalue()
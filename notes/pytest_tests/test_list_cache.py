@@ -0,0 +1,88 @@
+# test_list_cache.py
+import re
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.cache import list_version
+from notes.models import Note
+
+
+def note_queries(client, url):
+    """Запросы к таблице заметок, выполненные при загрузке страницы."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'notes_note' in query['sql']
+    ]
+
+
+def without_csrf_token(content):
+    # Маскированный токен CSRF меняется при каждой отрисовке страницы.
+    return re.sub(rb'name="csrfmiddlewaretoken" value="[^"]*"', b'', content)
+
+
+@pytest.fixture(params=('locmem', 'filebased'))
+def cache_backend(request, settings, tmp_path):
+    backend = {
+        'locmem': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'filebased': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }[request.param]
+    settings.CACHES = {'default': backend}
+
+
+@pytest.mark.usefixtures('cache_backend', 'sync_db_thread')
+@pytest.mark.parametrize('name', ('notes:list', 'notes_async:list'))
+def test_repeat_list_view_skips_note_queries(author_client, note, name):
+    url = reverse(name)
+    first, queries = note_queries(author_client, url)
+    assert queries
+    second, queries = note_queries(author_client, url)
+    assert queries == []
+    assert without_csrf_token(second.content) == without_csrf_token(
+        first.content
+    )
+
+
+@pytest.mark.usefixtures('cache_backend')
+def test_list_cache_is_invalidated_on_change(
+        author_client, author, note, django_capture_on_commit_callbacks
+):
+    url = reverse('notes:list')
+    author_client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        Note.objects.create(title='Новая', text='Текст', author=author)
+    assert 'Новая' in author_client.get(url).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        note.delete()
+    assert note.title not in author_client.get(url).content.decode()
+
+
+def test_list_cache_is_per_author(author_client, not_author_client, note):
+    url = reverse('notes:list')
+    author_client.get(url)
+    content = not_author_client.get(url).content.decode()
+    assert note.title not in content
+
+
+def test_version_is_bumped_after_commit(
+        author, django_capture_on_commit_callbacks
+):
+    version = list_version(author.pk)
+    with django_capture_on_commit_callbacks() as callbacks:
+        Note.objects.create(title='Новая', text='Текст', author=author)
+        # До коммита чужой запрос ещё видит старые заметки и не должен
+        # кэшировать их под новой версией.
+        assert list_version(author.pk) == version
+    for callback in callbacks:
+        callback()
+    assert list_version(author.pk) != version
@@ -15,6 +15,16 @@ from notes.forms import WARNING
 from pytils.translit import slugify
 from http import HTTPStatus
 
+from types import SimpleNamespace
+
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from notes.slugs import (
+    SlugConflict, is_slug_conflict, make_slug, slug_cache_info,
+    slug_candidates, slug_constraints,
+)
+
 
 # Указываем фикстуру form_data в параметрах теста.
 def test_user_can_create_note(author_client, author, form_data):
@@ -122,4 +132,79 @@ def test_other_user_cant_delete_note(not_author_client, slug_for_args):
     url = reverse('notes:delete', args=slug_for_args)
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
-    assert Note.objects.count() == 1 
\ No newline at end of file
+    assert Note.objects.count() == 1 
+
+
+def test_empty_slug_conflict_gets_suffix(author_client, author, form_data):
+    url = reverse('notes:add')
+    form_data.pop('slug')
+    # Заметка с адресом, который получился бы из заголовка, уже есть.
+    Note.objects.create(
+        title='Другая', text='Текст',
+        slug=slugify(form_data['title']), author=author,
+    )
+    response = author_client.post(url, data=form_data)
+    assertRedirects(response, reverse('notes:success'))
+    new_note = Note.objects.latest('id')
+    assert new_note.slug == slugify(form_data['title']) + '-2'
+
+
+def test_create_note_without_slug_precheck(author_client, form_data):
+    url = reverse('notes:add')
+    with CaptureQueriesContext(connection) as context:
+        author_client.post(url, data=form_data)
+    # Уникальность slug проверяет БД, отдельного SELECT по заметкам нет.
+    note_selects = [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and '"notes_note"' in query['sql']
+    ]
+    assert note_selects == []
+
+
+def test_slug_attempts_are_bounded(author):
+    base = slugify('Заголовок')
+    for slug in slug_candidates(base, 100):
+        Note.objects.create(title='Занято', slug=slug, author=author)
+    with pytest.raises(SlugConflict):
+        Note.objects.create(title='Заголовок', author=author)
+
+
+def test_slug_transliteration_is_cached():
+    make_slug.cache_clear()
+    assert make_slug('Заголовок') == slugify('Заголовок')
+    make_slug('Заголовок')
+    info = slug_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def postgres_error(constraint, message):
+    # psycopg2 передаёт имя нарушенного ограничения в diag.
+    cause = Exception(message)
+    cause.diag = SimpleNamespace(constraint_name=constraint)
+    error = IntegrityError(message)
+    error.__cause__ = cause
+    return error
+
+
+def test_only_slug_constraint_is_slug_conflict(note):
+    assert is_slug_conflict(
+        IntegrityError('UNIQUE constraint failed: notes_note.slug'),
+        note, 'default',
+    )
+    assert not is_slug_conflict(
+        IntegrityError('NOT NULL constraint failed: notes_note.slug'),
+        note, 'default',
+    )
+    slug_constraint, = slug_constraints('default', 'notes_note', 'slug')
+    assert is_slug_conflict(
+        postgres_error(slug_constraint, 'duplicate key'), note, 'default'
+    )
+    # Значения полей в DETAIL не путают проверку.
+    assert not is_slug_conflict(
+        postgres_error(
+            'notes_noteterm_note_term_uniq',
+            'DETAIL: Key (note_id, term)=(1, slug) already exists.',
+        ),
+        note, 'default',
+    )
@@ -0,0 +1,164 @@
+# test_query_budget.py
+# Каждый адрес приложения укладывается в заданное число запросов к БД.
+# Бюджеты точные: лишний запрос (N+1, повторная проверка уникальности)
+# роняет тест, а сэкономленный — повод уменьшить бюджет.
+import re
+from collections import Counter
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.urls.resolvers import URLResolver
+
+from notes.models import Note
+from yanote.urls import urlpatterns
+
+AUTHOR = 'author'
+ANONYMOUS = 'anonymous'
+
+# (адрес, кто, метод): число запросов. Запросы автора включают чтение
+# сессии и пользователя, а страницы — сводки заметок для шапки: кэш
+# перед каждым тестом пуст.
+BUDGETS = {
+    ('notes:home', AUTHOR, 'get'): 3,
+    ('notes:home', ANONYMOUS, 'get'): 0,
+    ('notes:add', AUTHOR, 'get'): 3,
+    ('notes:add', AUTHOR, 'post'): 12,
+    ('notes:add', ANONYMOUS, 'get'): 0,
+    ('notes:edit', AUTHOR, 'get'): 4,
+    ('notes:edit', AUTHOR, 'post'): 14,
+    ('notes:edit', ANONYMOUS, 'get'): 0,
+    ('notes:detail', AUTHOR, 'get'): 5,
+    ('notes:detail', ANONYMOUS, 'get'): 0,
+    ('notes:raw', AUTHOR, 'get'): 5,
+    ('notes:raw', ANONYMOUS, 'get'): 0,
+    ('notes:delete', AUTHOR, 'get'): 4,
+    ('notes:delete', AUTHOR, 'post'): 8,
+    ('notes:delete', ANONYMOUS, 'get'): 0,
+    ('notes:list', AUTHOR, 'get'): 4,
+    ('notes:list', ANONYMOUS, 'get'): 0,
+    ('notes:success', AUTHOR, 'get'): 3,
+    ('notes:success', ANONYMOUS, 'get'): 0,
+    ('notes:search', AUTHOR, 'get'): 7,
+    ('notes:search', ANONYMOUS, 'get'): 0,
+    ('notes:bulk', AUTHOR, 'get'): 2,
+    ('notes:bulk', AUTHOR, 'post'): 12,
+    ('notes:bulk', ANONYMOUS, 'get'): 0,
+    ('notes_async:add', AUTHOR, 'get'): 3,
+    ('notes_async:add', AUTHOR, 'post'): 12,
+    ('notes_async:add', ANONYMOUS, 'get'): 0,
+    ('notes_async:edit', AUTHOR, 'get'): 4,
+    ('notes_async:edit', AUTHOR, 'post'): 14,
+    ('notes_async:edit', ANONYMOUS, 'get'): 0,
+    ('notes_async:detail', AUTHOR, 'get'): 5,
+    ('notes_async:detail', ANONYMOUS, 'get'): 0,
+    ('notes_async:delete', AUTHOR, 'get'): 4,
+    ('notes_async:delete', AUTHOR, 'post'): 8,
+    ('notes_async:delete', ANONYMOUS, 'get'): 0,
+    ('notes_async:list', AUTHOR, 'get'): 4,
+    ('notes_async:list', ANONYMOUS, 'get'): 0,
+    ('api:list', AUTHOR, 'get'): 3,
+    ('api:list', ANONYMOUS, 'get'): 0,
+    ('api:batch', AUTHOR, 'get'): 3,
+    ('api:batch', ANONYMOUS, 'get'): 0,
+    ('api:detail', AUTHOR, 'get'): 3,
+    ('api:changes', AUTHOR, 'get'): 3,
+    ('api:changes', ANONYMOUS, 'get'): 0,
+    ('api:detail', ANONYMOUS, 'get'): 0,
+    ('users:login', AUTHOR, 'get'): 3,
+    ('users:login', ANONYMOUS, 'get'): 0,
+    ('users:logout', AUTHOR, 'get'): 4,
+    ('users:logout', ANONYMOUS, 'get'): 0,
+    ('users:signup', AUTHOR, 'get'): 3,
+    ('users:signup', ANONYMOUS, 'get'): 0,
+    ('admin:index', AUTHOR, 'get'): 2,
+    ('admin:index', ANONYMOUS, 'get'): 0,
+}
+# Адреса с slug заметки в пути.
+WITH_SLUG = ('edit', 'detail', 'delete', 'raw')
+# Пространства имён, все адреса которых должны иметь бюджет.
+COVERED = ('notes', 'notes_async', 'api', 'users')
+
+
+def normalize(sql):
+    """SQL без значений параметров, чтобы группировать повторы."""
+    return re.sub(r"'[^']*'|\b\d+\b", '?', sql)
+
+
+def report(label, queries, budget):
+    """Пронумерованный SQL; повторяющиеся запросы отмечены числом."""
+    repeats = Counter(normalize(query['sql']) for query in queries)
+    lines = [f'{label}: {len(queries)} запросов, бюджет {budget}']
+    for number, query in enumerate(queries, 1):
+        count = repeats[normalize(query['sql'])]
+        mark = f'  [повторяется {count} раз]' if count > 1 else ''
+        lines.append(f'{number:>3}. {query["sql"]}{mark}')
+    return '\n'.join(lines)
+
+
+def request_data(name):
+    action = name.split(':')[1]
+    if action in ('add', 'edit'):
+        return {'title': 'Заголовок', 'text': 'Текст', 'slug': 'new-slug'}
+    if action == 'search':
+        return {'q': 'заметки'}
+    if name == 'api:batch':
+        return {'slug': ['note-slug', 'missing']}
+    if action == 'bulk':
+        return {'action': 'delete', 'notes': ['note-slug', 'missing']}
+    return {}
+
+
+@pytest.mark.parametrize(
+    'name, who, method', sorted(BUDGETS), ids='-'.join
+)
+def test_query_budget(
+        name, who, method, note, client, author_client, sync_db_thread
+):
+    args = (note.slug,) if name.split(':')[1] in WITH_SLUG else ()
+    url = reverse(name, args=args)
+    current_client = author_client if who == AUTHOR else client
+    data = request_data(name)
+    with CaptureQueriesContext(connection) as captured:
+        response = getattr(current_client, method)(url, data)
+        if response.streaming:
+            # Потоковый ответ читает БД, пока его передают.
+            b''.join(response.streaming_content)
+    budget = BUDGETS[name, who, method]
+    label = f'{method.upper()} {url} ({who})'
+    assert len(captured) == budget, report(label, captured, budget)
+
+
+def named_patterns(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from named_patterns(
+                pattern.url_patterns, pattern.namespace or namespace
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield f'{namespace}:{pattern.name}'
+
+
+def test_every_route_has_budget():
+    names = {
+        name for name in named_patterns(urlpatterns)
+        if name.split(':')[0] in COVERED
+    }
+    missing = {
+        (name, who) for name in names for who in (AUTHOR, ANONYMOUS)
+        if (name, who, 'get') not in BUDGETS
+    }
+    assert not missing, f'Нет бюджета запросов: {sorted(missing)}'
+
+
+def test_list_budget_does_not_grow_with_notes(author, author_client, note):
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {i}', text='Текст', slug=f'n-{i}', author=author)
+        for i in range(20)
+    )
+    with CaptureQueriesContext(connection) as captured:
+        author_client.get(reverse('notes:list'))
+    budget = BUDGETS['notes:list', AUTHOR, 'get']
+    assert len(captured) == budget, report('notes:list', captured, budget)
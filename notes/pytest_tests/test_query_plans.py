@@ -0,0 +1,51 @@
+# test_query_plans.py
+# Запросы представлений заметок должны идти по индексам, а не перебором
+# всей таблицы и без дополнительной сортировки.
+import pytest
+
+from django.db import connection
+
+from notes.models import Note
+
+# Признаки полного перебора и сортировки в плане запроса.
+BAD_PLAN_MARKERS = {
+    'sqlite': ('SCAN notes_note', 'TEMP B-TREE'),
+    'postgresql': ('Seq Scan', 'Sort'),
+}
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # На маленькой таблице Postgres и так выберет перебор.
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+    return queryset.explain()
+
+
+@pytest.fixture
+def author_notes(author):
+    return author.note_set.all()
+
+
+@pytest.mark.skipif(
+    connection.vendor not in BAD_PLAN_MARKERS,
+    reason='План проверяется только для SQLite и PostgreSQL.'
+)
+@pytest.mark.parametrize(
+    'make_queryset',
+    (
+        # Страница списка заметок.
+        lambda notes: notes.only(*Note.LIST_FIELDS).order_by(
+            'author', 'id'
+        )[:51],
+        # Следующая страница списка по курсору.
+        lambda notes: notes.filter(id__gt=100).order_by('author', 'id')[:51],
+        # Заметка, её редактирование и удаление.
+        lambda notes: notes.filter(slug='note-slug'),
+    ),
+    ids=('list', 'list-cursor', 'detail'),
+)
+def test_note_queries_use_indexes(author_notes, make_queryset):
+    plan = explain(make_queryset(author_notes))
+    for marker in BAD_PLAN_MARKERS[connection.vendor]:
+        assert marker not in plan, plan
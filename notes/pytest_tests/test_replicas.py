@@ -0,0 +1,161 @@
+# test_replicas.py
+# Основную БД и реплику изображают два отдельных файла SQLite без
+# репликации между ними: запись в основную БД на реплике не видна,
+# поэтому сразу видно, откуда прочитаны данные.
+import tempfile
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test.client import Client
+from django.urls import reverse
+
+from notes.models import Note
+from yanote import routers
+from yanote.middleware import PIN_COOKIE
+from yanote.routers import PrimaryReplicaRouter
+
+REPLICA = 'replica'
+
+# Псевдоним нужен до начала теста: pytest-django проверяет databases.
+connections.databases[REPLICA] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': str(Path(tempfile.mkdtemp()) / 'replica.sqlite3'),
+}
+connections.ensure_defaults(REPLICA)
+connections.prepare_test_settings(REPLICA)
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=('default', REPLICA)
+)
+
+
+@pytest.fixture(autouse=True)
+def replica(settings):
+    call_command('migrate', database=REPLICA, verbosity=0)
+    settings.DATABASE_REPLICAS = [REPLICA]
+    # Сессия в cookie, чтобы не зависеть от таблицы сессий на реплике.
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+
+
+@pytest.fixture
+def replicated_author():
+    # Пользователь уже «доехал» до реплики.
+    user = get_user_model().objects.create(username='Автор')
+    get_user_model().objects.using(REPLICA).create(
+        pk=user.pk, username=user.username
+    )
+    return user
+
+
+@pytest.fixture
+def replicated_client(replicated_author):
+    client = Client()
+    client.force_login(replicated_author)
+    client.cookies.pop(PIN_COOKIE, None)
+    return client
+
+
+def test_router_reads_from_replica_writes_to_primary():
+    router = PrimaryReplicaRouter()
+    tokens = routers.start_request(pinned=False)
+    try:
+        assert router.db_for_read(Note) == REPLICA
+        assert router.db_for_write(Note) == 'default'
+        # После записи чтение в том же запросе — с основной БД.
+        assert router.db_for_read(Note) == 'default'
+    finally:
+        routers.finish_request(tokens)
+
+
+def test_router_without_replicas(settings):
+    settings.DATABASE_REPLICAS = []
+    assert PrimaryReplicaRouter().db_for_read(Note) == 'default'
+
+
+def list_titles(client):
+    return [
+        note.title for note in client.get(reverse('notes:list')).context[
+            'object_list'
+        ]
+    ]
+
+
+def detail_status(client, slug):
+    return client.get(reverse('notes:detail', args=(slug,))).status_code
+
+
+def test_note_is_read_from_replica(replicated_client, replicated_author):
+    Note.objects.create(
+        title='Новая', text='Текст', slug='new', author=replicated_author
+    )
+    # На реплике заметки ещё нет.
+    assert detail_status(replicated_client, 'new') == HTTPStatus.NOT_FOUND
+
+
+def test_cached_pages_are_read_from_primary(
+        replicated_client, replicated_author
+):
+    # Версия списка уже сброшена, а реплика ещё не получила заметку:
+    # прочитанное с неё осталось бы в кэше под новой версией.
+    Note.objects.create(
+        title='Новая', text='Текст', slug='new', author=replicated_author
+    )
+    response = replicated_client.get(reverse('notes:list'))
+    assert [note.title for note in response.context['object_list']] == [
+        'Новая'
+    ]
+    assert response.context['notes_summary'].notes_count == 1
+    response = replicated_client.get(reverse('api:list'))
+    assert [note['title'] for note in response.json()['results']] == [
+        'Новая'
+    ]
+    response = replicated_client.get(reverse('api:changes'), {'cursor': 0})
+    assert [change['slug'] for change in response.json()['changes']] == [
+        'new'
+    ]
+
+
+def test_reads_are_pinned_after_write(replicated_client):
+    response = replicated_client.post(
+        reverse('notes:add'),
+        {'title': 'Новая', 'text': 'Текст', 'slug': 'new'},
+    )
+    assert PIN_COOKIE in response.cookies
+    # Следующий запрос с cookie читает с основной БД и видит заметку.
+    assert detail_status(replicated_client, 'new') == HTTPStatus.OK
+    # Когда cookie истекла, чтение снова идёт с реплики.
+    replicated_client.cookies.pop(PIN_COOKIE)
+    assert detail_status(replicated_client, 'new') == HTTPStatus.NOT_FOUND
+
+
+def test_streamed_text_is_read_from_pinned_primary(
+        settings, replicated_client, replicated_author
+):
+    settings.NOTES_STREAM_MIN_BYTES = 100
+    settings.NOTES_STREAM_CHUNK_BYTES = 64
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 10 ** 6
+    text = 'Большой текст. ' * 30 + 'Конец.'
+    replicated_client.post(
+        reverse('notes:add'), {'title': 'Большая', 'text': text, 'slug': 'big'}
+    )
+    # Запись в фикстурах привязала к основной БД сам тест; у потока
+    # сервера вне запроса такой привязки нет.
+    tokens = routers.start_request(pinned=False)
+    try:
+        # Части текста читаются уже после конца запроса, но всё равно
+        # с основной БД, к которой клиент привязан после записи.
+        response = replicated_client.get(
+            reverse('notes:raw', args=('big',))
+        )
+        assert b''.join(response.streaming_content) == text.encode()
+        response = replicated_client.get(
+            reverse('notes:detail', args=('big',))
+        )
+        assert text in b''.join(response.streaming_content).decode()
+    finally:
+        routers.finish_request(tokens)
@@ -0,0 +1,137 @@
+# test_response_compression.py
+# Сжатие ответов на лету и сокращение HTML.
+import gzip
+import zlib
+from http import HTTPStatus
+
+import pytest
+
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note
+from yanote import compression
+from yanote.minify import minify_html
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, 'brotli', None)
+
+
+@pytest.fixture
+def long_note(settings, author):
+    # Несжатый в БД текст такого размера отдаётся страницей целиком.
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 10 ** 6
+    return Note.objects.create(
+        title='Длинная', text='Много слов. ' * 500, slug='long',
+        author=author,
+    )
+
+
+def content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def test_accepted_encodings(rf):
+    request = rf.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, BR;q=0.5, x;q=y')
+    assert compression.accepted_encodings(request) == {'br'}
+
+
+def test_gzip_page(gzip_only, author_client, long_note):
+    url = reverse('notes:detail', args=(long_note.slug,))
+    response = author_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    body = gzip.decompress(response.content)
+    assert long_note.text.encode() in body
+    assert response['Content-Length'] == str(len(response.content))
+    assert author_client.get(url).content == body
+
+
+def test_small_response_not_compressed(author_client):
+    response = author_client.get(
+        reverse('api:list'), HTTP_ACCEPT_ENCODING='gzip, br'
+    )
+    assert not response.has_header('Content-Encoding')
+    assert not response.has_header('Vary') or (
+        'Accept-Encoding' not in response['Vary']
+    )
+
+
+def test_etag_becomes_weak(gzip_only, author_client, long_note):
+    url = reverse('api:detail', args=(long_note.slug,))
+    response = author_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['ETag'].startswith('W/"')
+    cached = author_client.get(
+        url, HTTP_ACCEPT_ENCODING='gzip',
+        HTTP_IF_NONE_MATCH=response['ETag'],
+    )
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_streaming_response(gzip_only, settings, author_client, long_note):
+    settings.NOTES_STREAM_MIN_BYTES = 1
+    settings.NOTES_STREAM_CHUNK_BYTES = 1024
+    url = reverse('notes:detail', args=(long_note.slug,))
+    response = author_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response.streaming
+    assert response['Content-Encoding'] == 'gzip'
+    assert not response.has_header('Content-Length')
+    body = zlib.decompress(content(response), zlib.MAX_WBITS | 16)
+    assert long_note.text.encode() in body
+
+
+def test_range_not_compressed(author_client, long_note):
+    response = author_client.get(
+        reverse('notes:raw', args=(long_note.slug,)),
+        HTTP_ACCEPT_ENCODING='gzip', HTTP_RANGE='bytes=0-9',
+    )
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert not response.has_header('Content-Encoding')
+    assert content(response) == long_note.text.encode()[:10]
+
+
+def test_brotli_preferred(author_client, long_note):
+    response = author_client.get(
+        reverse('notes:detail', args=(long_note.slug,)),
+        HTTP_ACCEPT_ENCODING='gzip, br',
+    )
+    assert response['Content-Encoding'] == 'br'
+    body = compression.brotli.decompress(response.content)
+    assert long_note.text.encode() in body
+
+
+def test_compression_disabled(settings, author, long_note):
+    settings.RESPONSE_COMPRESSION = False
+    client = Client()
+    client.force_login(author)
+    response = client.get(
+        reverse('notes:detail', args=(long_note.slug,)),
+        HTTP_ACCEPT_ENCODING='gzip',
+    )
+    assert not response.has_header('Content-Encoding')
+
+
+def test_minify_html():
+    html = (
+        '<ul>\n    <li>a   b</li>\n\n    <li>c</li>\n</ul>\n'
+        '<pre>  x\n    y</pre>\n<textarea>\n  t  </textarea>'
+    )
+    assert minify_html(html) == (
+        '<ul>\n<li>a b</li>\n<li>c</li>\n</ul>\n'
+        '<pre>  x\n    y</pre>\n<textarea>\n  t  </textarea>'
+    )
+
+
+def test_minified_page(settings, author, note):
+    settings.MINIFY_HTML = True
+    client = Client()
+    client.force_login(author)
+    response = client.get(reverse('notes:detail', args=(note.slug,)))
+    assert b'\n ' not in response.content
+    assert note.text.encode() in response.content
+    assert response['Content-Length'] == str(len(response.content))
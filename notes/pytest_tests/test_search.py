@@ -0,0 +1,83 @@
+# test_search.py
+from http import HTTPStatus
+
+import pytest
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from notes.models import Note, NoteTerm
+from notes.search import search_notes, tokenize
+
+
+@pytest.fixture
+def notes(author, not_author):
+    return {
+        'cats': Note.objects.create(
+            title='Кошки', text='Про кошек и котят. Кошки спят.',
+            slug='cats', author=author,
+        ),
+        'dogs': Note.objects.create(
+            title='Собаки', text='Собаки и кошки дружат.',
+            slug='dogs', author=author,
+        ),
+        'alien': Note.objects.create(
+            title='Кошки', text='Чужие кошки.',
+            slug='alien', author=not_author,
+        ),
+    }
+
+
+def test_tokenize():
+    assert tokenize('Ёжик и ЁЛКА, ёлка!') == ['ежик', 'елка', 'елка']
+
+
+def test_search_ranks_author_notes(author, notes):
+    results = list(search_notes(author, 'кошки'))
+    assert [row['slug'] for row in results] == ['cats', 'dogs']
+
+
+def test_search_requires_all_words(author, notes):
+    results = list(search_notes(author, 'кошки дружат'))
+    assert [row['slug'] for row in results] == ['dogs']
+    assert list(search_notes(author, 'кошки жирафы')) == []
+
+
+def test_index_follows_changes(author, notes):
+    note = notes['dogs']
+    note.text = 'Собаки и жирафы.'
+    note.save()
+    assert [row['slug'] for row in search_notes(author, 'жирафы')] == [
+        'dogs'
+    ]
+    assert [row['slug'] for row in search_notes(author, 'кошки')] == [
+        'cats'
+    ]
+    note.delete()
+    assert not NoteTerm.objects.filter(note_id=note.pk).exists()
+
+
+def test_search_page(author_client, notes):
+    response = author_client.get(reverse('notes:search'), {'q': 'кошки'})
+    assert response.status_code == HTTPStatus.OK
+    slugs = [row['slug'] for row in response.context['object_list']]
+    assert slugs == ['cats', 'dogs']
+
+
+def test_imported_notes_are_indexed(author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(
+        '{"title": "Кошки", "text": "Текст"}', encoding='utf-8'
+    )
+    call_command('import_notes', str(path), author=author.username)
+    assert [row['title'] for row in search_notes(author, 'кошки')] == [
+        'Кошки'
+    ]
+
+
+def test_reindex_notes(author, notes):
+    NoteTerm.objects.all().delete()
+    call_command('reindex_notes', batch_size=1)
+    assert [row['slug'] for row in search_notes(author, 'кошки')] == [
+        'cats', 'dogs'
+    ]
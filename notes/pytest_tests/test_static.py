@@ -0,0 +1,84 @@
+# test_static.py
+# Собранная статика: имена с хешем, сжатые копии и заголовки кэша.
+import gzip
+from http import HTTPStatus
+
+import brotli
+import pytest
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, override_settings
+
+
+@pytest.fixture(scope='module')
+def static_root(tmp_path_factory):
+    root = tmp_path_factory.mktemp('static')
+    with override_settings(STATIC_ROOT=str(root)):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        yield root
+
+
+def get(path, **headers):
+    # Новый клиент — новая цепочка middleware со списком файлов.
+    return Client().get(path, **headers)
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+def test_unhashed_urls_without_collectstatic():
+    assert staticfiles_storage.url('css/notes.css') == '/static/css/notes.css'
+
+
+def test_hashed_file_is_immutable(static_root):
+    url = staticfiles_storage.url('css/notes.css')
+    assert url != '/static/css/notes.css'
+    response = get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert 'immutable' in response['Cache-Control']
+    assert content(response) == (static_root / url[8:]).read_bytes()
+
+
+def test_unhashed_file_is_revalidated(static_root):
+    response = get('/static/css/notes.css')
+    assert 'must-revalidate' in response['Cache-Control']
+
+
+def test_gzip_variant(static_root):
+    url = staticfiles_storage.url('admin/css/base.css')
+    response = get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Vary'] == 'Accept-Encoding'
+    original = (static_root / url[8:]).read_bytes()
+    assert gzip.decompress(content(response)) == original
+
+
+def test_brotli_variant(static_root):
+    url = staticfiles_storage.url('admin/css/base.css')
+    assert (static_root / (url[8:] + '.br')).exists()
+    response = get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response['Content-Encoding'] == 'br'
+    original = (static_root / url[8:]).read_bytes()
+    assert brotli.decompress(content(response)) == original
+
+
+def test_gzip_refused(static_root):
+    url = staticfiles_storage.url('admin/css/base.css')
+    response = get(url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+    assert not response.has_header('Content-Encoding')
+
+
+def test_not_modified(static_root):
+    url = staticfiles_storage.url('admin/css/base.css')
+    etag = get(url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+    response = get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_pages_link_hashed_files(static_root):
+    url = staticfiles_storage.url('css/notes.css')
+    assert url in get('/').content.decode()
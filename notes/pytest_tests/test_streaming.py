@@ -0,0 +1,217 @@
+# test_streaming.py
+# Большие тексты заметок передаются потоком, файл текста — с Range.
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from notes.models import Note
+from notes.streaming import TextChanged
+
+TEXT = 'Ёлка <ель> и щука; ' * 20
+
+
+@pytest.fixture(autouse=True)
+def small_limits(settings):
+    settings.NOTES_STREAM_MIN_BYTES = 100
+    # Части по 7 байт рвут двухбайтовые буквы пополам.
+    settings.NOTES_STREAM_CHUNK_BYTES = 7
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 0
+
+
+@pytest.fixture
+def big_note(author):
+    return Note.objects.create(
+        title='Большая', text=TEXT, slug='big', author=author
+    )
+
+
+def content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+def test_small_note_is_rendered_at_once(author_client, note):
+    response = author_client.get(reverse('notes:detail', args=(note.slug,)))
+    assert not response.streaming
+    assert response.context['note'].text == note.text
+
+
+def test_big_note_is_streamed(author_client, big_note):
+    response = author_client.get(reverse('notes:detail', args=('big',)))
+    assert response.streaming
+    page = content(response).decode()
+    assert 'Ёлка &lt;ель&gt; и щука; ' * 20 in page
+    assert page.rstrip().endswith('</html>')
+
+
+def test_compressed_note_is_streamed(author, author_client, settings):
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 100
+    note = Note.objects.create(
+        title='Сжатая', text=TEXT, slug='z', author=author
+    )
+    # В БД текст меньше порога, но в памяти он занял бы больше.
+    assert len(Note._meta.get_field('text').get_prep_value(note.text)) < (
+        settings.NOTES_STREAM_MIN_BYTES
+    )
+    response = author_client.get(reverse('notes:detail', args=('z',)))
+    assert response.streaming
+    assert 'Ёлка &lt;ель&gt; и щука; ' * 20 in content(response).decode()
+
+
+def test_stream_fails_when_note_changes(author_client, big_note):
+    response = author_client.get(reverse('notes:raw', args=('big',)))
+    chunks = iter(response.streaming_content)
+    next(chunks)
+    Note.objects.filter(pk=big_note.pk).update(updated_at=timezone.now())
+    with pytest.raises(TextChanged):
+        b''.join(chunks)
+
+
+@pytest.mark.parametrize('compressed', (False, True))
+def test_stream_fails_when_text_is_recompressed(
+        author_client, big_note, settings, compressed
+):
+    if compressed:
+        settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 1
+        big_note.save()
+    response = author_client.get(reverse('notes:raw', args=('big',)))
+    chunks = iter(response.streaming_content)
+    received = next(chunks)
+    call_command(
+        'compress_notes', min_bytes=1, decompress=compressed,
+        stdout=StringIO(),
+    )
+    with pytest.raises(TextChanged):
+        for chunk in chunks:
+            received += chunk
+    # Ни одного байта из переписанного значения.
+    assert TEXT.encode().startswith(received)
+
+
+def test_raw_download(author_client, big_note):
+    response = author_client.get(reverse('notes:raw', args=('big',)))
+    assert content(response) == TEXT.encode()
+    assert response['Accept-Ranges'] == 'bytes'
+    assert int(response['Content-Length']) == len(TEXT.encode())
+
+
+@pytest.fixture(params=(False, True), ids=('plain', 'packed'))
+def ranged_note(request, author, settings):
+    if request.param:
+        settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 100
+    return Note.objects.create(
+        title='Большая', text=TEXT, slug='big', author=author
+    )
+
+
+@pytest.mark.parametrize('header, start, end', (
+    ('bytes=2-9', 2, 10),
+    ('bytes=5-', 5, None),
+    ('bytes=-4', -4, None),
+    # Больше одной части по NOTES_STREAM_CHUNK_BYTES.
+    ('bytes=20-200', 20, 201),
+))
+def test_raw_range(author_client, ranged_note, header, start, end):
+    response = author_client.get(
+        reverse('notes:raw', args=('big',)), HTTP_RANGE=header
+    )
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert content(response) == TEXT.encode()[start:end]
+    size = len(TEXT.encode())
+    assert response['Content-Range'].endswith(f'/{size}')
+
+
+def test_raw_range_not_satisfiable(author_client, ranged_note):
+    response = author_client.get(
+        reverse('notes:raw', args=('big',)), HTTP_RANGE='bytes=100000-'
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+
+def test_raw_if_range_mismatch_sends_everything(author_client, big_note):
+    response = author_client.get(
+        reverse('notes:raw', args=('big',)),
+        HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"old"',
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert content(response) == TEXT.encode()
+
+
+def test_raw_compressed_without_range(author, author_client, settings):
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 100
+    Note.objects.create(title='Сжатая', text=TEXT, slug='z', author=author)
+    response = author_client.get(reverse('notes:raw', args=('z',)))
+    assert content(response) == TEXT.encode()
+    assert response['Accept-Ranges'] == 'bytes'
+    # Размер сжатого текста без лишней распаковки неизвестен.
+    assert not response.has_header('Content-Length')
+
+
+def test_raw_of_other_author(not_author_client, big_note):
+    response = not_author_client.get(reverse('notes:raw', args=('big',)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def asgi_get(client, path):
+    """GET через ASGI-приложение, как под uvicorn: (статус, тело)."""
+    cookie = '; '.join(
+        f'{name}={morsel.value}' for name, morsel in client.cookies.items()
+    )
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+    async def run():
+        communicator = ApplicationCommunicator(get_asgi_application(), scope)
+        await communicator.send_input({'type': 'http.request'})
+        start = await communicator.receive_output(5)
+        body = b''
+        message = {'more_body': True}
+        while message.get('more_body'):
+            message = await communicator.receive_output(5)
+            body += message.get('body', b'')
+        return start['status'], body
+
+    # Как и тестовый клиент, не закрываем соединение с тестовой БД.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        return async_to_sync(run)()
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+@pytest.mark.parametrize('name, text', (
+    ('notes:detail', escape(TEXT)),
+    ('notes:raw', TEXT),
+))
+def test_stream_under_asgi(author_client, big_note, name, text):
+    # ASGIHandler перебирает потоковый ответ в цикле событий, где
+    # обращаться к БД нельзя.
+    status, body = asgi_get(author_client, reverse(name, args=('big',)))
+    assert status == HTTPStatus.OK
+    assert text.encode() in body
@@ -0,0 +1,157 @@
+# test_summary.py
+# Сводка заметок автора меняется вместе с заметками и видна в шапке.
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.models import Note, NoteSummary
+from notes.summary import actual_summaries, check_summaries, summary_fields
+
+
+def stored(author):
+    return summary_fields(NoteSummary.objects.get(author=author))
+
+
+def actual(author):
+    return summary_fields(actual_summaries([author.pk])[author.pk])
+
+
+def create(author, slug, text='Текст'):
+    return Note.objects.create(
+        title='Заголовок', text=text, slug=slug, author=author
+    )
+
+
+def test_new_user_has_empty_summary(author):
+    assert stored(author) == (0, 0, None)
+
+
+def test_summary_follows_note_changes(author, not_author):
+    first = create(author, 'first', 'Текст')
+    second = create(author, 'second', 'Ещё текст')
+    create(not_author, 'alien')
+    assert stored(author) == actual(author)
+    assert stored(author)[:2] == (2, len('ТекстЕщё текст'.encode()))
+    first.text = 'Другой текст, подлиннее'
+    first.save()
+    assert stored(author) == actual(author)
+    assert stored(author)[2] == first.updated_at
+    second.delete()
+    assert stored(author) == actual(author)
+    first.delete()
+    assert stored(author) == (0, 0, None)
+    assert stored(not_author) == actual(not_author)
+
+
+def test_delete_latest_recomputes_last_edited(author):
+    older = create(author, 'older')
+    Note.objects.filter(pk=older.pk).update(
+        updated_at=timezone.now() - timedelta(days=1)
+    )
+    call_command('rebuild_note_summaries')
+    create(author, 'newer').delete()
+    assert stored(author)[2] == Note.objects.get(pk=older.pk).updated_at
+
+
+def test_compressed_text_counted_as_stored(settings, author):
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 16
+    create(author, 'packed', 'повтор ' * 1000)
+    assert stored(author) == actual(author)
+    assert stored(author)[1] < len(('повтор ' * 1000).encode())
+
+
+def test_bulk_paths(author, author_client):
+    notes = [create(author, f'note-{index}') for index in range(3)]
+    author_client.post(reverse('notes:bulk'), {
+        'action': 'update', 'notes': ['note-0', 'note-1'],
+        'text': 'Новый текст для двух заметок',
+    })
+    assert stored(author) == actual(author)
+    author_client.post(reverse('notes:bulk'), {
+        'action': 'delete', 'ids': [notes[0].pk, notes[2].pk],
+    })
+    assert stored(author) == actual(author)
+    assert stored(author)[0] == 1
+
+
+def test_import_updates_summary(author, tmp_path):
+    path = tmp_path / 'notes.jsonl'
+    path.write_text(
+        '{"title": "Первая", "text": "Текст"}\n'
+        '{"title": "Вторая", "text": "Ещё текст"}\n',
+        encoding='utf-8',
+    )
+    call_command('import_notes', str(path), author=author.username)
+    assert stored(author) == actual(author)
+    assert stored(author)[0] == 2
+
+
+def test_check_and_rebuild(author, not_author):
+    create(author, 'note')
+    NoteSummary.objects.filter(author=author).update(notes_count=5)
+    NoteSummary.objects.filter(author=not_author).delete()
+    assert {author_id for author_id, *_ in check_summaries()} == {
+        author.pk, not_author.pk
+    }
+    with pytest.raises(CommandError):
+        call_command('check_note_summaries', stdout=StringIO())
+    call_command('rebuild_note_summaries', stdout=StringIO())
+    assert check_summaries() == []
+    call_command('check_note_summaries', stdout=StringIO())
+
+
+def test_header_shows_summary_without_aggregates(author, author_client):
+    create(author, 'note', 'Текст')
+    url = reverse('notes:home')
+    author_client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = author_client.get(url)
+    assert 'заметок: 1' in response.content.decode()
+    assert not any('COUNT(' in query['sql'] for query in captured)
+
+
+@pytest.mark.parametrize('name', (
+    'notes:detail',
+    # Асинхронным представлениям нужны закоммиченные данные.
+    pytest.param(
+        'notes_async:detail', marks=pytest.mark.django_db(transaction=True)
+    ),
+))
+def test_detail_page_has_fresh_summary(
+        name, author, author_client, django_capture_on_commit_callbacks
+):
+    note = create(author, 'note')
+    url = reverse(name, args=(note.slug,))
+    etag = author_client.get(url)['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        create(author, 'other')
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'заметок: 2' in response.content.decode()
+
+
+def test_compress_notes_updates_summary(
+        settings, author, author_client, django_capture_on_commit_callbacks
+):
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 0
+    create(author, 'log', 'строка журнала\n' * 2000)
+    url = reverse('notes:home')
+    # Сводка попадает в кэш шапки.
+    author_client.get(url).context['notes_summary'].text_bytes
+    settings.NOTES_TEXT_COMPRESSION_MIN_BYTES = 4096
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('compress_notes', stdout=StringIO())
+    assert stored(author) == actual(author)
+    header = author_client.get(url).context['notes_summary']
+    assert header.text_bytes == stored(author)[1]
+    call_command('check_note_summaries', stdout=StringIO())
+    call_command('compress_notes', decompress=True, stdout=StringIO())
+    assert stored(author) == actual(author)
@@ -0,0 +1,32 @@
+# test_templates.py
+# Шаблоны загружаются кэширующим загрузчиком и компилируются заранее.
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+from notes.warmup import warm_templates
+
+
+def cached_loader():
+    loader = engines['django'].engine.template_loaders[0]
+    assert isinstance(loader, CachedLoader)
+    return loader
+
+
+def test_warm_templates_fills_cache():
+    loader = cached_loader()
+    loader.reset()
+    names = warm_templates()
+    assert {'base.html', 'includes/header.html', 'notes/list.html'} <= set(
+        names
+    )
+    assert set(names) <= set(loader.get_template_cache)
+
+
+def test_warm_templates_command():
+    out = StringIO()
+    call_command('warm_templates', stdout=out)
+    assert 'notes/detail.html' in out.getvalue()
+    assert 'Скомпилировано шаблонов' in out.getvalue()
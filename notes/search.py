@@ -0,0 +1,89 @@
+import math
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+
+from .models import Note, NoteTerm
+
+# Слово из заголовка весит больше, чем слово из текста.
+TITLE_WEIGHT = 5
+# Слово считается редким, если встречается реже, чем в каждой
+# RARE_TERM_RATIO-й заметке автора.
+RARE_TERM_RATIO = 10
+TERM_MAX_LENGTH = NoteTerm._meta.get_field('term').max_length
+WORD_RE = re.compile(r'\w{2,}')
+
+
+def tokenize(text):
+    """Слова текста в нижнем регистре, «ё» приравнивается к «е»."""
+    return [
+        word[:TERM_MAX_LENGTH]
+        for word in WORD_RE.findall(text.lower().replace('ё', 'е'))
+    ]
+
+
+def note_terms(note):
+    """Записи индекса для одной заметки."""
+    weights = Counter(tokenize(note.text))
+    for word in tokenize(note.title):
+        weights[word] += TITLE_WEIGHT
+    return [
+        NoteTerm(note_id=note.pk, author_id=note.author_id,
+                 term=term, weight=weight)
+        for term, weight in weights.items()
+    ]
+
+
+def index_notes(notes):
+    """
+    Перестраивает записи индекса для заметок.
+
+    Вызывается после сохранения: старые слова заметок удаляются
+    одним запросом, новые добавляются одним bulk_create.
+    """
+    notes = list(notes)
+    terms = [term for note in notes for term in note_terms(note)]
+    with transaction.atomic():
+        NoteTerm.objects.filter(note__in=[note.pk for note in notes]).delete()
+        NoteTerm.objects.bulk_create(terms)
+
+
+def search_notes(author, query):
+    """
+    Заметки автора, содержащие все слова запроса, по убыванию релевантности.
+
+    Релевантность — сумма весов слов в заметке, умноженных на обратную
+    частоту слова среди заметок автора (tf-idf). Возвращает словари
+    с ключами note_id, slug, title и score.
+    """
+    words = set(tokenize(query))
+    if not words:
+        return NoteTerm.objects.none()
+    terms = NoteTerm.objects.filter(author=author, term__in=words)
+    frequencies = dict(
+        terms.order_by().values_list('term').annotate(Count('id'))
+    )
+    if len(frequencies) < len(words):
+        return NoteTerm.objects.none()
+    total = Note.objects.filter(author=author).count()
+    rarest = min(frequencies, key=frequencies.get)
+    if len(words) > 1 and frequencies[rarest] * RARE_TERM_RATIO < total:
+        # Все слова обязательны: если одно из них редкое, кандидаты —
+        # только заметки с ним, а не все заметки с частыми словами.
+        terms = terms.filter(note_id__in=NoteTerm.objects.filter(
+            author=author, term=rarest
+        ).values('note_id'))
+    idf = Case(
+        *(
+            When(term=term, then=Value(math.log(1 + total / frequency)))
+            for term, frequency in frequencies.items()
+        ),
+        output_field=FloatField(),
+    )
+    return terms.values(
+        'note_id', slug=F('note__slug'), title=F('note__title')
+    ).annotate(
+        matched=Count('term'), score=Sum(F('weight') * idf)
+    ).filter(matched=len(words)).order_by('-score', 'note_id')
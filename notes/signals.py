@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import Signal, receiver
+
+from .backends import forget_user
+from .cache import bump_list_version
+from .changes import author_deleted, author_deleting, record_changes
+from .models import Note, NoteChange, NoteSummary
+from .search import index_notes
+from .summary import add_notes, note_deleting, remove_notes
+
+# Отправляется после bulk_create заметок, для которого post_save
+# не срабатывает. Аргумент notes — сохранённые заметки с pk.
+notes_bulk_created = Signal()
+# Отправляется после update() заметок, для которого post_save тоже
+# не срабатывает. Аргумент notes — заметки с новыми значениями полей.
+notes_bulk_updated = Signal()
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def note_changed(sender, instance, **kwargs):
+    """Изменение заметки делает закэшированный список автора устаревшим."""
+    bump_list_version(instance.author_id)
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, **kwargs):
+    """Слова сохранённой заметки попадают в поисковый индекс."""
+    index_notes([instance])
+
+
+@receiver(post_save, sender=Note)
+def note_saved_to_log(sender, instance, created, **kwargs):
+    action = NoteChange.CREATED if created else NoteChange.UPDATED
+    record_changes([instance], action)
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    record_changes([instance], NoteChange.DELETED)
+
+
+@receiver(notes_bulk_created, sender=Note)
+@receiver(notes_bulk_updated, sender=Note)
+def notes_saved_in_bulk(sender, notes, **kwargs):
+    bump_list_version(*{note.author_id for note in notes})
+    index_notes(notes)
+
+
+@receiver(pre_save, sender=Note)
+def note_saving_to_summary(sender, instance, **kwargs):
+    if not instance._state.adding:
+        remove_notes(instance.author_id, Note.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Note)
+def note_saved_to_summary(sender, instance, **kwargs):
+    add_notes(instance.author_id, Note.objects.filter(pk=instance.pk))
+
+
+@receiver(pre_delete, sender=Note)
+def note_deleting_from_summary(sender, instance, **kwargs):
+    note_deleting(instance)
+
+
+@receiver(notes_bulk_created, sender=Note)
+@receiver(notes_bulk_updated, sender=Note)
+def notes_saved_to_summary(sender, notes, **kwargs):
+    ids = {}
+    for note in notes:
+        ids.setdefault(note.author_id, []).append(note.pk)
+    for author_id, pks in ids.items():
+        add_notes(author_id, Note.objects.filter(pk__in=pks))
+
+
+@receiver(notes_bulk_created, sender=Note)
+def notes_created_to_log(sender, notes, **kwargs):
+    record_changes(notes, NoteChange.CREATED)
+
+
+@receiver(notes_bulk_updated, sender=Note)
+def notes_updated_to_log(sender, notes, **kwargs):
+    record_changes(notes, NoteChange.UPDATED)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, **kwargs):
+    """Пароль или статус пользователя изменились — кэш устарел."""
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_created(sender, instance, created, using, **kwargs):
+    """У нового пользователя сразу есть пустая сводка заметок."""
+    if created:
+        NoteSummary.objects.using(using).create(author=instance)
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleting(sender, instance, **kwargs):
+    # Заметки удаляются каскадом уже после записей журнала автора.
+    instance._changes_token = author_deleting(instance.pk)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    token = getattr(instance, '_changes_token', None)
+    if token is not None:
+        author_deleted(token)
+        del instance._changes_token
+
+
+@receiver(user_logged_out)
+def user_logged_out_handler(sender, request, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,122 @@
+from functools import lru_cache
+
+from django.db import IntegrityError, connections
+from pytils.translit import slugify
+
+# Сколько вариантов адреса перебирать, прежде чем сдаться.
+SLUG_MAX_ATTEMPTS = 10
+# Сколько заголовков помнит кэш транслитерации.
+SLUG_CACHE_SIZE = 4096
+
+
+class SlugConflict(IntegrityError):
+    """Адрес заметки уже занят другой заметкой."""
+
+    def __init__(self, slug):
+        super().__init__(slug)
+        self.slug = slug
+
+
+@lru_cache(maxsize=SLUG_CACHE_SIZE)
+def make_slug(title):
+    """
+    Адрес из заголовка через pytils.translit.slugify.
+
+    Транслитерация заметно дороже поиска в словаре, а при импорте
+    и массовом пересохранении заголовки часто повторяются.
+    """
+    return slugify(title)
+
+
+def slug_cache_info():
+    """Попадания, промахи и размер кэша транслитерации."""
+    return make_slug.cache_info()
+
+
+def slug_candidates(base, max_length, attempts=SLUG_MAX_ATTEMPTS):
+    """Варианты адреса: base, base-2, base-3 и так далее."""
+    yield base[:max_length]
+    for number in range(2, attempts + 1):
+        suffix = f'-{number}'
+        yield base[:max_length - len(suffix)] + suffix
+
+
+def slug_base(note, rename=True):
+    """
+    Основа адреса заметки и число вариантов для перебора: заданный
+    явно адрес при rename=False пробуется один раз.
+    """
+    if not note.slug:
+        return make_slug(note.title), SLUG_MAX_ATTEMPTS
+    return note.slug, SLUG_MAX_ATTEMPTS if rename else 1
+
+
+def allocate_slugs(notes, queryset, rename=True):
+    """
+    Подбирает свободные адреса сразу для пачки заметок.
+
+    Занятость проверяется одним запросом на каждый круг перебора
+    вариантов, а не запросом на заметку. Заметки с пустым slug получают
+    адрес из заголовка; занятый адрес заменяется вариантом с суффиксом,
+    а если rename=False, заданный явно адрес не меняется.
+    Возвращает заметки, для которых свободного адреса не нашлось.
+    """
+    max_length = queryset.model._meta.get_field('slug').max_length
+    pending = []
+    for note in notes:
+        base, attempts = slug_base(note, rename)
+        candidates = slug_candidates(base, max_length, attempts)
+        note.slug = next(candidates)
+        pending.append((note, candidates))
+    used = set()
+    failed = []
+    while pending:
+        taken = set(queryset.filter(
+            slug__in=[note.slug for note, _ in pending]
+        ).values_list('slug', flat=True))
+        retry = []
+        for note, candidates in pending:
+            if note.slug not in taken and note.slug not in used:
+                used.add(note.slug)
+                continue
+            note.slug = next(candidates, None)
+            if note.slug is None:
+                failed.append(note)
+            else:
+                retry.append((note, candidates))
+        pending = retry
+    return failed
+
+
+@lru_cache(maxsize=None)
+def slug_constraints(using, table, column):
+    """Имена ограничений уникальности, которые состоят из одного column."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return frozenset(
+        name for name, info in constraints.items()
+        if info['unique'] and info['columns'] == [column]
+    )
+
+
+def is_slug_conflict(error, note, using):
+    """
+    Нарушено ли ограничение уникальности адреса заметки, а не другое.
+
+    PostgreSQL сообщает имя ограничения (diag), SQLite — таблицу и
+    столбец в тексте ошибки; в тексте могут быть и значения полей,
+    поэтому слово slug в нём ничего не значит. Для остальных БД уже
+    после ошибки проверяется, занят ли адрес другой заметкой.
+    """
+    table = note._meta.db_table
+    column = note._meta.get_field('slug').column
+    diag = getattr(error.__cause__, 'diag', None)
+    constraint = getattr(diag, 'constraint_name', None)
+    if constraint:
+        return constraint in slug_constraints(using, table, column)
+    if connections[using].vendor == 'sqlite':
+        return str(error) == f'UNIQUE constraint failed: {table}.{column}'
+    return type(note)._base_manager.using(using).filter(
+        slug=note.slug
+    ).exclude(pk=note.pk).exists()
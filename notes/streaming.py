@@ -0,0 +1,202 @@
+"""
+Чтение больших текстов заметок из БД частями.
+
+Текст не загружается в память целиком: каждая часть — отдельный запрос
+SUBSTR по байтам UTF-8. Части читаются с условием на updated_at и на
+вид хранения (сжат текст или нет), и если заметку изменили, удалили
+или переписали командой compress_notes посреди передачи, выбрасывается
+TextChanged: передача обрывается с ошибкой, а не склеивает старое
+начало с новым концом и не заканчивается молча раньше Content-Length.
+
+Под ASGI Django 3.2 перебирает потоковый ответ прямо в цикле событий,
+где ORM недоступен. Там части текста читаются заранее, ещё в потоке
+представления (prefetched): ответ остаётся тем же, но текст целиком
+лежит в памяти.
+"""
+import base64
+import codecs
+import zlib
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import (
+    BooleanField, Case, ExpressionWrapper, F, TextField, Value, When,
+)
+from django.utils.html import escape
+
+from .fields import MARKER
+from .functions import ByteSubstr, OctetLength
+from .models import Note
+
+MARKER_BYTES = len(MARKER.encode())
+
+
+class TextChanged(Exception):
+    """Заметку изменили или удалили во время передачи её текста."""
+
+
+def with_text_info(queryset, inline_bytes):
+    """
+    Заметки без текста, но с его размером в БД (text_size), признаком
+    сжатия (text_packed) и самим текстом в inline_text, если он не
+    сжат и короче inline_bytes байт; иначе inline_text — None.
+
+    Сжатый текст в inline_text не попадает никогда: по размеру в БД
+    нельзя узнать, сколько он займёт в памяти после распаковки.
+    """
+    stored = ExpressionWrapper(F('text'), output_field=TextField())
+    return queryset.defer('text').annotate(
+        text_size=OctetLength('text'),
+        text_packed=Case(
+            When(text__startswith=MARKER, then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+    ).annotate(
+        inline_text=Case(
+            When(
+                text_size__lt=inline_bytes, text_packed=False, then=stored
+            ),
+            default=Value(None),
+            output_field=TextField(),
+        ),
+    )
+
+
+def iter_stored(note, start, end):
+    """
+    Байты [start, end) значения text, как оно лежит в БД.
+
+    Части читаются из той же БД, что и заметка: ответ передаётся уже
+    после конца запроса, когда маршрутизатор не помнит, что клиент
+    привязан к основной БД, и отправил бы чтение на реплику.
+    """
+    queryset = Note.objects.using(note._state.db).filter(
+        pk=note.pk, updated_at=note.updated_at
+    )
+    # compress_notes переписывает текст, не трогая updated_at.
+    if note.text_packed:
+        queryset = queryset.filter(text__startswith=MARKER)
+    else:
+        queryset = queryset.exclude(text__startswith=MARKER)
+    chunk_size = settings.NOTES_STREAM_CHUNK_BYTES
+    while start < end:
+        chunk = queryset.annotate(
+            chunk=ByteSubstr('text', start + 1, min(chunk_size, end - start))
+        ).values_list('chunk', flat=True).first()
+        if not chunk:
+            raise TextChanged(note.pk)
+        chunk = bytes(chunk)
+        yield chunk
+        start += len(chunk)
+
+
+def iter_unpacked(chunks):
+    """Распаковывает сжатое значение, поданное частями без признака."""
+    inflater = zlib.decompressobj()
+    pending = b''
+    for chunk in chunks:
+        data = pending + chunk
+        # base64 декодируется группами по четыре символа.
+        usable = len(data) - len(data) % 4
+        pending = data[usable:]
+        yield inflater.decompress(base64.b64decode(data[:usable]))
+    yield inflater.decompress(base64.b64decode(pending)) + inflater.flush()
+
+
+def iter_slice(chunks, start, end=None):
+    """Байты [start, end) потока частей chunks."""
+    position = 0
+    for chunk in chunks:
+        if end is not None and position >= end:
+            # Генератор частей закрывается: остаток из БД не читается.
+            break
+        following = position + len(chunk)
+        if following > start:
+            yield chunk[
+                max(start - position, 0):
+                None if end is None else end - position
+            ]
+        position = following
+
+
+def iter_text_bytes(note, start=0, end=None):
+    """
+    Байты [start, end) текста заметки в UTF-8 частями.
+
+    Заметка должна быть получена через with_text_info. Несжатый текст
+    читается из БД прямо с start; сжатый распаковывается с начала, и
+    байты до start отбрасываются.
+    """
+    if note.text_packed:
+        chunks = iter_slice(iter_unpacked(
+            iter_stored(note, MARKER_BYTES, note.text_size)
+        ), start, end)
+    else:
+        chunks = iter_stored(
+            note, start, note.text_size if end is None else end
+        )
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+
+
+def iter_text_html(note):
+    """Текст заметки частями, экранированный для HTML."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in iter_text_bytes(note):
+        yield escape(decoder.decode(chunk))
+    yield escape(decoder.decode(b'', final=True))
+
+
+def text_length(note):
+    """
+    Размер текста заметки в байтах UTF-8. Сжатый текст ради этого
+    распаковывается частями, целиком в памяти он не оказывается.
+    """
+    if not note.text_packed:
+        return note.text_size
+    return sum(len(chunk) for chunk in iter_text_bytes(note))
+
+
+def prefetched(request, chunks):
+    """
+    Части ответа: под ASGI — прочитанные сразу, иначе — как есть.
+
+    Обращаться к БД можно только в потоке представления, а ASGIHandler
+    в Django 3.2 перебирает потоковый ответ в цикле событий.
+    """
+    if isinstance(request, ASGIRequest):
+        return list(chunks)
+    return chunks
+
+
+class RangeNotSatisfiable(Exception):
+    """Запрошенный диапазон за пределами текста."""
+
+
+def parse_range(header, size):
+    """
+    Диапазон (start, end) из заголовка Range, end не включается.
+
+    None — заголовка нет или он не поддерживается (например, несколько
+    диапазонов), тогда отдаётся весь текст.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    first, separator, last = header[len('bytes='):].strip().partition('-')
+    if not separator or ',' in last:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable
+            return max(size - suffix, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+    if start < 0 or start >= size or end <= start:
+        raise RangeNotSatisfiable
+    return start, min(end, size)
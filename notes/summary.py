@@ -0,0 +1,203 @@
+"""
+Сводка заметок автора: поддержка при изменениях, пересчёт и проверка.
+
+Сводка меняется приращениями, одним UPDATE на автора: перед изменением
+или удалением заметки из неё вычитаются старые значения, после
+сохранения прибавляются новые. Размеры текстов считает сама БД.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, Subquery, Sum, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import bump_list_version, from_primary, list_version
+from .functions import OctetLength
+from .models import Note, NoteSummary
+
+# Внутри deleting() сигналы удаления заметок сводку не трогают.
+_deleting = ContextVar('notes_summary_deleting', default=False)
+
+
+def _aggregate(notes, **aggregates):
+    """Подзапрос с агрегатом по заметкам notes одного автора."""
+    (name, aggregate), = aggregates.items()
+    return Subquery(
+        notes.order_by().values('author_id').annotate(
+            **{name: aggregate}
+        ).values(name)
+    )
+
+
+def _totals(notes):
+    return (
+        Coalesce(_aggregate(notes, count=Count('pk')), 0),
+        Coalesce(_aggregate(notes, size=Sum(OctetLength('text'))), 0),
+        _aggregate(notes, edited_at=Max('updated_at')),
+    )
+
+
+def add_notes(author_id, notes):
+    """
+    Прибавляет к сводке автора заметки из QuerySet notes, уже
+    сохранённые в БД. Если сводки ещё нет, она пересчитывается.
+    """
+    notes = notes.filter(author_id=author_id)
+    count, size, edited_at = _totals(notes)
+    updated = NoteSummary.objects.filter(author_id=author_id).update(
+        notes_count=F('notes_count') + count,
+        text_bytes=F('text_bytes') + size,
+        last_edited_at=Case(
+            When(last_edited_at__gte=edited_at, then=F('last_edited_at')),
+            default=Coalesce(edited_at, F('last_edited_at')),
+        ),
+    )
+    if not updated:
+        rebuild_summaries([author_id])
+
+
+def remove_notes(author_id, notes, deleted=False):
+    """
+    Вычитает из сводки автора заметки из QuerySet notes, пока они ещё
+    в БД. Если заметки удаляются (deleted), время последнего изменения
+    пересчитывается по оставшимся, но только когда удаляется самая
+    свежая заметка.
+    """
+    notes = notes.filter(author_id=author_id)
+    count, size, edited_at = _totals(notes)
+    # Если сводка разошлась с заметками (их меняли в обход сигналов),
+    # не уходим в минус: пусть расхождение найдёт check_note_summaries.
+    values = {
+        'notes_count': Greatest(F('notes_count') - count, 0),
+        'text_bytes': Greatest(F('text_bytes') - size, 0),
+    }
+    if deleted:
+        rest = Note.objects.filter(author_id=author_id).exclude(
+            pk__in=notes.values('pk')
+        )
+        values['last_edited_at'] = Case(
+            When(last_edited_at__gt=edited_at, then=F('last_edited_at')),
+            default=_aggregate(rest, edited_at=Max('updated_at')),
+        )
+    NoteSummary.objects.filter(author_id=author_id).update(**values)
+
+
+def change_text_bytes(deltas):
+    """
+    Меняет объём текстов в сводках авторов, когда тексты переписаны в
+    обход сигналов. deltas — {id автора: разница в байтах}.
+    """
+    for author_id, delta in deltas.items():
+        if delta:
+            NoteSummary.objects.filter(author_id=author_id).update(
+                text_bytes=Greatest(F('text_bytes') + delta, 0)
+            )
+    # В шапке закэширована сводка под версией списка.
+    bump_list_version(*deltas)
+
+
+def note_deleting(note):
+    """Заметка вот-вот будет удалена."""
+    if not _deleting.get():
+        remove_notes(
+            note.author_id, Note.objects.filter(pk=note.pk), deleted=True
+        )
+
+
+@contextmanager
+def deleting(author_id, notes):
+    """
+    Вычитает заметки notes из сводки одним запросом и отключает
+    вычитание по одной заметке на время их удаления в блоке.
+    """
+    remove_notes(author_id, notes, deleted=True)
+    token = _deleting.set(True)
+    try:
+        yield
+    finally:
+        _deleting.reset(token)
+
+
+def actual_summaries(author_ids=None):
+    """Сводки, посчитанные заново по заметкам, по id автора."""
+    users = get_user_model().objects.order_by('pk')
+    notes = Note.objects.order_by()
+    if author_ids is not None:
+        users = users.filter(pk__in=author_ids)
+        notes = notes.filter(author_id__in=author_ids)
+    summaries = {
+        pk: NoteSummary(author_id=pk)
+        for pk in users.values_list('pk', flat=True)
+    }
+    rows = notes.values('author_id').annotate(
+        count=Count('pk'),
+        size=Sum(OctetLength('text')),
+        edited_at=Max('updated_at'),
+    )
+    for row in rows:
+        summary = summaries.get(row['author_id'])
+        if summary is not None:
+            summary.notes_count = row['count']
+            summary.text_bytes = row['size'] or 0
+            summary.last_edited_at = row['edited_at']
+    return summaries
+
+
+def rebuild_summaries(author_ids=None):
+    """Пересчитывает сводки авторов (по умолчанию всех), возвращает их."""
+    summaries = actual_summaries(author_ids)
+    with transaction.atomic():
+        stored = NoteSummary.objects.all()
+        if author_ids is not None:
+            stored = stored.filter(author_id__in=author_ids)
+        stored.delete()
+        NoteSummary.objects.bulk_create(summaries.values())
+    # Закэшированные сводки устарели вместе с версией списка.
+    bump_list_version(*summaries)
+    return summaries
+
+
+def summary_fields(summary):
+    return summary.notes_count, summary.text_bytes, summary.last_edited_at
+
+
+def check_summaries():
+    """
+    Сравнивает сохранённые сводки с посчитанными заново. Возвращает
+    список (id автора, сохранённая или None, верная) для расхождений.
+    """
+    stored = NoteSummary.objects.in_bulk()
+    problems = []
+    for author_id, actual in actual_summaries().items():
+        summary = stored.get(author_id)
+        if summary is None or (
+            summary_fields(summary) != summary_fields(actual)
+        ):
+            problems.append((author_id, summary, actual))
+    return problems
+
+
+def summary_for(user):
+    """
+    Сводка пользователя для шапки; для анонимного — None.
+
+    Сводка кэшируется под версией списка заметок автора: версия
+    меняется при каждом изменении заметок, как и сама сводка.
+    """
+    if not user.is_authenticated:
+        return None
+    key = f'notes:summary:{user.pk}:{list_version(user.pk)}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = from_primary(
+            NoteSummary.objects.filter(author=user)
+        ).first()
+        if summary is None:
+            summary = rebuild_summaries([user.pk])[user.pk]
+            key = f'notes:summary:{user.pk}:{list_version(user.pk)}'
+        cache.set(key, summary, settings.NOTES_LIST_CACHE_TIMEOUT)
+    return summary
@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from notes.models import Note
@@ -55,6 +56,10 @@ class TestWithoutNote(TestCase):
         cls.list_url = reverse('notes:list', args=None)
         cls.success_url = reverse('notes:success', args=None)
 
+    def setUp(self):
+        # БД после каждого теста откатывается, а кэш — нет.
+        cache.clear()
+
 
 class TestWithNote(TestWithoutNote):
     """Класс для тестов заметок (с объектом заметки)."""
@@ -1,9 +1,83 @@
+from itertools import chain
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
-from .forms import NoteForm
+from .bulk import bulk_change
+from .cache import from_primary, list_version
+from .fields import unpack_text
+from .forms import WARNING, NoteBulkForm, NoteForm
 from .models import Note
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_notes
+from .slugs import SlugConflict
+from .streaming import (
+    RangeNotSatisfiable, iter_text_bytes, iter_text_html, parse_range,
+    prefetched, text_length, with_text_info,
+)
+
+# Место текста в отрисованной странице заметки, которая передаётся
+# потоком: шаблон делится по нему на начало и конец.
+TEXT_PLACEHOLDER = 'note-text-placeholder-7d1c0a'
+
+
+def note_marker(request, slug):
+    """
+    Время изменения заметки одним запросом по индексу (author, slug).
+
+    Результат запоминается в запросе: ETag и Last-Modified
+    вычисляются по одной и той же выборке.
+    """
+    if not request.user.is_authenticated:
+        return None
+    if not hasattr(request, 'note_updated_at'):
+        request.note_updated_at = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values_list('updated_at', flat=True).first()
+    return request.note_updated_at
+
+
+def note_etag(request, slug):
+    updated_at = note_marker(request, slug)
+    if updated_at is None:
+        return None
+    return f'{request.user.pk}-{slug}-{updated_at.timestamp()}'
+
+
+def note_page_etag(request, slug):
+    """
+    Метка страницы заметки. В шапке страницы — сводка по всем заметкам
+    автора, поэтому метка меняется и вместе с версией списка.
+    """
+    etag = note_etag(request, slug)
+    if etag is None:
+        return None
+    return f'{etag}-{list_version(request.user.pk)}'
+
+
+def note_last_modified(request, slug):
+    return note_marker(request, slug)
+
+
+def notes_list_etag(request):
+    """Метка списка — версия списка автора из кэша, без запросов к БД."""
+    if not request.user.is_authenticated:
+        return None
+    return '-'.join((
+        str(request.user.pk),
+        list_version(request.user.pk),
+        str(settings.NOTES_PAGE_SIZE),
+        request.GET.get('cursor', ''),
+    ))
 
 
 class Home(generic.TemplateView):
@@ -20,28 +94,41 @@ class NoteBase(LoginRequiredMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
+    # Если задано, из БД читаются только эти поля заметки.
+    only_fields = None
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        queryset = self.model.objects.filter(author=self.request.user)
+        if self.only_fields:
+            queryset = queryset.only(*self.only_fields)
+        return queryset
 
 
-class NoteCreate(NoteBase, generic.CreateView):
-    """Добавление заметки."""
+class NoteFormBase(NoteBase):
+    """Базовый класс для создания и редактирования заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        """Занятый slug показывается как ошибка поля формы."""
+        try:
+            return super().form_valid(form)
+        except SlugConflict as error:
+            form.add_error('slug', error.slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteFormBase, generic.CreateView):
+    """Добавление заметки."""
+
+    def form_valid(self, form):
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteFormBase, generic.UpdateView):
     """Редактирование заметки."""
-    template_name = 'notes/form.html'
-    form_class = NoteForm
 
 
 class NoteDelete(NoteBase, generic.DeleteView):
@@ -49,11 +136,171 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+@method_decorator(condition(etag_func=notes_list_etag), name='dispatch')
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя, постранично по курсору.
+
+    Отрисованный список кэшируется для каждого автора и страницы;
+    при попадании в кэш заметки из БД не читаются.
+    """
     template_name = 'notes/list.html'
+    ordering = ('author', 'id')
+    # Тексты заметок в списке не показываются, не читаем их из БД.
+    only_fields = Note.LIST_FIELDS
+
+    def get_queryset(self):
+        # Записи читаются, только когда фрагмента нет в кэше.
+        return from_primary(super().get_queryset())
 
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_PAGE_SIZE
 
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.get_ordering()
+        )
+        try:
+            page = paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        # Страница ленивая: пока её не читают, запроса к БД нет.
+        return paginator, page, page, True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['list_cache_timeout'] = settings.NOTES_LIST_CACHE_TIMEOUT
+        context['list_version'] = list_version(self.request.user.pk)
+        return context
+
+
+@method_decorator(
+    condition(
+        etag_func=note_page_etag, last_modified_func=note_last_modified
+    ),
+    name='dispatch',
+)
 class NoteDetail(NoteBase, generic.DetailView):
-    """Заметка подробно."""
+    """
+    Заметка подробно.
+
+    Текст от NOTES_STREAM_MIN_BYTES байт не читается в память: начало
+    страницы уходит сразу, затем текст частями из БД, затем конец.
+    Под ASGI части читаются заранее (см. notes.streaming).
+    """
     template_name = 'notes/detail.html'
+
+    def get_queryset(self):
+        return with_text_info(
+            super().get_queryset(), settings.NOTES_STREAM_MIN_BYTES
+        )
+
+    def get(self, request, *args, **kwargs):
+        self.object = note = self.get_object()
+        if note.inline_text is not None:
+            note.text = unpack_text(note.inline_text)
+            return self.render_to_response(self.get_context_data())
+        note.text = TEXT_PLACEHOLDER
+        page = render_to_string(
+            self.get_template_names(), self.get_context_data(), request
+        )
+        head, tail = page.split(TEXT_PLACEHOLDER, 1)
+        return StreamingHttpResponse(prefetched(
+            request, chain([head], iter_text_html(note), [tail])
+        ))
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_last_modified),
+    name='dispatch',
+)
+class NoteRaw(NoteBase, generic.View):
+    """
+    Текст заметки как text/plain, частями из БД.
+
+    Поддерживается один диапазон Range в байтах. Размер сжатого текста
+    в БД не хранится: для Content-Length его текст распаковывается
+    лишний раз, поэтому целиком сжатый текст отдаётся без размера.
+    """
+    content_type = 'text/plain; charset=utf-8'
+
+    def get(self, request, slug):
+        note = get_object_or_404(
+            with_text_info(self.get_queryset(), 0), slug=slug
+        )
+        header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        if if_range and if_range != f'"{note_etag(request, slug)}"':
+            header = None
+        size = None
+        if header or not note.text_packed:
+            size = text_length(note)
+        try:
+            byte_range = parse_range(header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        start, end = byte_range or (0, size)
+        response = StreamingHttpResponse(
+            prefetched(request, iter_text_bytes(note, start, end)),
+            content_type=self.content_type,
+            status=206 if byte_range else 200,
+        )
+        response['Accept-Ranges'] = 'bytes'
+        if size is not None:
+            response['Content-Length'] = end - start
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+        return response
+
+
+class NoteSearch(NoteBase, generic.ListView):
+    """Поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+    context_object_name = 'results'
+
+    def get_paginate_by(self, queryset):
+        return settings.NOTES_PAGE_SIZE
+
+    def get_queryset(self):
+        return search_notes(self.request.user, self.request.GET.get('q', ''))
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class NoteBulk(LoginRequiredMixin, generic.FormView):
+    """
+    Удаление или изменение выбранных заметок одним запросом.
+
+    Отвечает JSON, если клиент просит application/json, иначе
+    страницей с результатом по каждой заметке.
+    """
+    template_name = 'notes/bulk.html'
+    form_class = NoteBulkForm
+    http_method_names = ['post']
+
+    def wants_json(self):
+        return 'application/json' in self.request.headers.get('Accept', '')
+
+    def form_valid(self, form):
+        data = form.cleaned_data
+        results = bulk_change(
+            self.request.user, data['notes'], data['ids'],
+            form.changes() if data['action'] == form.UPDATE else None,
+        )
+        if self.wants_json():
+            return JsonResponse({'results': results})
+        return self.render_to_response(
+            self.get_context_data(form=form, results=results)
+        )
+
+    def form_invalid(self, form):
+        if self.wants_json():
+            return JsonResponse({'errors': form.errors}, status=400)
+        response = super().form_invalid(form)
+        response.status_code = 400
+        return response
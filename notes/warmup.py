@@ -0,0 +1,32 @@
+"""Предварительная компиляция шаблонов проекта."""
+from pathlib import Path
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+
+def template_names(directory):
+    """Имена всех шаблонов каталога в виде, понятном get_template."""
+    root = Path(directory)
+    return sorted(
+        path.relative_to(root).as_posix() for path in root.rglob('*.html')
+    )
+
+
+def warm_templates():
+    """
+    Компилирует все шаблоны из DIRS движков Django.
+
+    С кэширующим загрузчиком скомпилированные шаблоны остаются в памяти
+    процесса, и первые запросы не читают их с диска. Синтаксическая
+    ошибка в шаблоне поднимается сразу. Возвращает имена шаблонов.
+    """
+    names = []
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.dirs:
+            for name in template_names(directory):
+                engine.get_template(name)
+                names.append(name)
+    return names
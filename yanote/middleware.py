@@ -0,0 +1,213 @@
+import mimetypes
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from . import routers
+from .compression import (
+    accepted_encodings, available_encodings, compress, compress_stream,
+)
+from .minify import minify_html
+
+PIN_COOKIE = 'yanote_primary'
+
+
+class PrimaryPinningMiddleware:
+    """
+    Читать свои записи: после запроса с записью в основную БД
+    клиент получает cookie, и следующие REPLICA_PIN_SECONDS секунд его
+    запросы читают с основной БД, пока реплики догоняют её.
+
+    Должен стоять раньше SessionMiddleware: сессия тоже читается из БД.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        tokens = routers.start_request(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            if routers.wrote_to_primary():
+                response.set_cookie(
+                    PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+        finally:
+            routers.finish_request(tokens)
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт собранную collectstatic статику из процесса приложения.
+
+    Список файлов читается один раз при запуске, поэтому запрос не
+    обращается к диску ради поиска. Файлы с хешем в имени отдаются с
+    кэшированием на год (immutable), остальные — с проверкой по ETag.
+    Клиенту, который принимает br или gzip, отдаётся готовая сжатая
+    копия, если она есть.
+    """
+    # Кодировка: расширение сжатой копии, в порядке предпочтения.
+    ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+    IMMUTABLE = 'public, max-age=31536000, immutable'
+    REVALIDATE = 'public, max-age=0, must-revalidate'
+
+    def __init__(self, get_response):
+        root = Path(settings.STATIC_ROOT or '')
+        if not settings.SERVE_STATIC or not root.is_dir():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        suffixes = tuple(suffix for _, suffix in self.ENCODINGS)
+        self.files = {}
+        for path in root.rglob('*'):
+            name = path.relative_to(root).as_posix()
+            if not path.is_file() or name.endswith(suffixes):
+                continue
+            stat = path.stat()
+            self.files[name] = {
+                'path': path,
+                'etag': f'"{stat.st_size:x}-{int(stat.st_mtime):x}"',
+                'cache_control': (
+                    self.IMMUTABLE if name in hashed else self.REVALIDATE
+                ),
+                'variants': {
+                    encoding: path.with_name(path.name + suffix)
+                    for encoding, suffix in self.ENCODINGS
+                    if path.with_name(path.name + suffix).is_file()
+                },
+            }
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(
+            self.prefix
+        ):
+            entry = self.files.get(request.path[len(self.prefix):])
+            if entry is not None:
+                return self.serve(request, entry)
+        return self.get_response(request)
+
+    def serve(self, request, entry):
+        path, encoding = entry['path'], None
+        accepted = accepted_encodings(request)
+        for name, _ in self.ENCODINGS:
+            if name in accepted and name in entry['variants']:
+                path, encoding = entry['variants'][name], name
+                break
+        # У каждой сжатой копии свой ETag: это другие байты.
+        etag = entry['etag'] if encoding is None else (
+            f'{entry["etag"][:-1]}-{encoding}"'
+        )
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            content_type, _ = mimetypes.guess_type(entry['path'].name)
+            response = FileResponse(
+                path.open('rb'),
+                content_type=content_type or 'application/octet-stream',
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Cache-Control'] = entry['cache_control']
+        if entry['variants']:
+            response['Vary'] = 'Accept-Encoding'
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Сжимает текстовые ответы в br (если установлен brotli) или gzip.
+
+    Обычные ответы сжимаются от RESPONSE_COMPRESSION_MIN_BYTES байт и
+    только если так они становятся меньше; потоковые — всегда, по мере
+    передачи. Ответы с диапазонами (Range) не сжимаются: диапазон
+    относится к несжатым байтам.
+    """
+    TYPES = (
+        'text/', 'application/json', 'application/javascript',
+        'application/xml', 'image/svg+xml',
+    )
+
+    def __init__(self, get_response):
+        if not settings.RESPONSE_COMPRESSION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        accepted = accepted_encodings(request)
+        encoding = next(
+            (name for name in available_encodings() if name in accepted),
+            None,
+        )
+        if encoding is None:
+            return response
+        level = settings.RESPONSE_COMPRESSION_LEVELS[encoding]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # Сжатый ответ равен исходному по смыслу, но не по байтам.
+        etag = response.get('ETag', '')
+        if etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compressible(self, response):
+        if (response.has_header('Content-Encoding')
+                or response.has_header('Accept-Ranges')
+                or response.status_code == 206):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if not content_type.strip().startswith(self.TYPES):
+            return False
+        return response.streaming or (
+            len(response.content) >= settings.RESPONSE_COMPRESSION_MIN_BYTES
+        )
+
+
+class HtmlMinifyMiddleware:
+    """
+    Убирает лишние пробелы и отступы из HTML-ответов (MINIFY_HTML).
+    Потоковые ответы не трогает.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MINIFY_HTML:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (response.streaming
+                or response.has_header('Content-Encoding')
+                or not response.get('Content-Type', '').startswith(
+                    'text/html'
+                )):
+            return response
+        charset = response.charset
+        response.content = minify_html(
+            response.content.decode(charset)
+        ).encode(charset)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+        return response
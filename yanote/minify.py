@@ -0,0 +1,25 @@
+"""Удаление лишних пробельных символов из отрисованного HTML."""
+import re
+
+# Содержимое этих элементов не трогаем: в нём пробелы значимы.
+PROTECTED = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+LINE_BREAKS = re.compile(r'\s*\n\s*')
+SPACES = re.compile(r'[ \t]{2,}')
+
+
+def minify_html(html):
+    """
+    Сворачивает пробелы и отступы: перевод строки с отступами — в один
+    перевод строки, несколько пробелов — в один. Пробел между
+    элементами при этом остаётся, поэтому вёрстка не меняется.
+    """
+    parts = PROTECTED.split(html)
+    # split с двумя группами: текст, защищённый элемент, имя тега, ...
+    for index in range(0, len(parts), 3):
+        parts[index] = SPACES.sub(' ', LINE_BREAKS.sub('\n', parts[index]))
+    return ''.join(
+        part for index, part in enumerate(parts) if index % 3 != 2
+    ).strip()
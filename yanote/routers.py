@@ -0,0 +1,52 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Чтение в текущем запросе идёт с основной БД.
+_pinned = ContextVar('pinned_to_primary', default=False)
+# В текущем запросе была запись в основную БД.
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def start_request(pinned):
+    """Сбрасывает состояние перед запросом, возвращает токены для reset."""
+    return _pinned.set(pinned), _wrote.set(False)
+
+
+def finish_request(tokens):
+    pinned_token, wrote_token = tokens
+    _pinned.reset(pinned_token)
+    _wrote.reset(wrote_token)
+
+
+def wrote_to_primary():
+    return _wrote.get()
+
+
+class PrimaryReplicaRouter:
+    """
+    Запись — в основную БД default, чтение — со случайной реплики
+    из settings.DATABASE_REPLICAS.
+
+    После первой записи чтение до конца запроса идёт с основной БД,
+    чтобы пользователь сразу видел свои изменения. На следующие запросы
+    это переносит PrimaryPinningMiddleware.
+
+    Данные, которые кэшируются под версией списка заметок, приложение
+    всегда читает с основной БД (notes.cache.from_primary).
+    """
+
+    def db_for_read(self, model, **hints):
+        if _pinned.get() or not settings.DATABASE_REPLICAS:
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        _pinned.set(True)
+        _wrote.set(True)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД.
+        return True
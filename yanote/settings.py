@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -23,6 +24,11 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yanote.middleware.StaticFilesMiddleware',
+    'yanote.middleware.CompressionMiddleware',
+    'yanote.middleware.HtmlMinifyMiddleware',
+    'yanote.middleware.PrimaryPinningMiddleware',
+    'notes.instrumentation.InstrumentationMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -33,18 +39,35 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yanote.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+# Скомпилированные шаблоны хранятся в памяти процесса. Отключите
+# (YANOTE_CACHED_TEMPLATES=0), чтобы правки шаблонов применялись сразу.
+if os.getenv('YANOTE_CACHED_TEMPLATES', '1') == '1':
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+# Компилировать все шаблоны из DIRS при запуске (NotesConfig.ready),
+# а не на первых запросах после выкладки.
+NOTES_WARM_TEMPLATES = os.getenv('YANOTE_WARM_TEMPLATES', '1') == '1'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
+        # С явным списком загрузчиков APP_DIRS должен быть выключен.
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notes.context_processors.notes_summary',
             ],
+            'loaders': TEMPLATE_LOADERS,
         },
     },
 ]
@@ -52,13 +75,89 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
-DATABASES = {
-    'default': {
+# Профиль БД выбирается переменной окружения YANOTE_DB_PROFILE:
+#   sqlite       — SQLite в режиме WAL с настройками PRAGMA (по умолчанию);
+#   sqlite-plain — SQLite с настройками по умолчанию;
+#   postgres     — PostgreSQL, параметры из переменных POSTGRES_*.
+# Соединения переиспользуются YANOTE_DB_CONN_MAX_AGE секунд. Пул
+# соединений для PostgreSQL — внешний (PgBouncer): укажите его адрес
+# в POSTGRES_HOST и POSTGRES_PORT.
+DATABASE_PROFILE = os.getenv('YANOTE_DB_PROFILE', 'sqlite')
+DATABASE_CONN_MAX_AGE = int(os.getenv('YANOTE_DB_CONN_MAX_AGE', 60))
+SQLITE_NAME = os.getenv('YANOTE_DB_NAME', BASE_DIR / 'db.sqlite3')
+
+DATABASE_PROFILES = {
+    'sqlite': {
+        'ENGINE': 'yanote.backends.sqlite3',
+        'NAME': SQLITE_NAME,
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+        'OPTIONS': {
+            # Сколько секунд ждать освобождения блокировки записи.
+            'timeout': 20,
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                # Размер кэша страниц в КиБ (отрицательное значение).
+                'cache_size': -20000,
+                'temp_store': 'MEMORY',
+            },
+        },
+    },
+    'sqlite-plain': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'NAME': SQLITE_NAME,
+    },
+    'postgres': {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'yanote'),
+        'USER': os.getenv('POSTGRES_USER', 'yanote'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+    },
+}
+
+DATABASES = {
+    'default': DATABASE_PROFILES[DATABASE_PROFILE],
 }
 
+# Реплики только для чтения: через запятую в YANOTE_DB_REPLICAS пути
+# к файлам для SQLite или адреса серверов для PostgreSQL.
+DATABASE_REPLICAS = []
+for number, location in enumerate(
+        filter(None, os.getenv('YANOTE_DB_REPLICAS', '').split(',')), 1
+):
+    alias = f'replica_{number}'
+    location_key = 'HOST' if DATABASE_PROFILE == 'postgres' else 'NAME'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        location_key: location,
+    }
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['yanote.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает с основной БД.
+REPLICA_PIN_SECONDS = int(os.getenv('YANOTE_REPLICA_PIN_SECONDS', 5))
+
+
+# Сессии и пользователь запроса, YANOTE_AUTH_PROFILE:
+#   db             — сессия и пользователь читаются из БД (по умолчанию);
+#   cached         — сессия в кэше с записью в БД, пользователь из кэша;
+#   signed_cookies — сессия в подписанной cookie, пользователь из кэша.
+# При нескольких процессах кэш должен быть общим (YANOTE_CACHE_DIR),
+# иначе смена пароля в одном процессе не сбросит кэш другого.
+AUTH_PROFILE = os.getenv('YANOTE_AUTH_PROFILE', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[AUTH_PROFILE]
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend'
+    if AUTH_PROFILE == 'db' else 'notes.backends.CachedModelBackend'
+]
+# Сколько секунд пользователь хранится в кэше.
+AUTH_USER_CACHE_TIMEOUT = 5 * 60
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -82,8 +181,95 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+# Сюда collectstatic собирает файлы с хешем содержимого в имени и их
+# сжатые копии .gz и .br (если установлен brotli).
+STATIC_ROOT = Path(os.getenv('YANOTE_STATIC_ROOT', BASE_DIR / 'staticfiles'))
+STATICFILES_STORAGE = 'yanote.storage.CompressedManifestStaticFilesStorage'
+# Отдавать собранную статику из процесса приложения (StaticFilesMiddleware).
+# Выключите, если статику отдаёт веб-сервер перед приложением.
+SERVE_STATIC = os.getenv('YANOTE_SERVE_STATIC', '1') == '1'
+
+# Сжатие страниц (CompressionMiddleware): br, если установлен brotli,
+# иначе gzip. Ответы короче порога в байтах не сжимаются.
+RESPONSE_COMPRESSION = os.getenv('YANOTE_COMPRESSION', '1') == '1'
+RESPONSE_COMPRESSION_MIN_BYTES = 1024
+RESPONSE_COMPRESSION_LEVELS = {'br': 5, 'gzip': 6}
+# Убирать лишние пробелы из HTML (HtmlMinifyMiddleware).
+MINIFY_HTML = os.getenv('YANOTE_MINIFY_HTML') == '1'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# По умолчанию кэш в памяти процесса. При нескольких процессах
+# укажите общий каталог в YANOTE_CACHE_DIR, тогда кэш будет файловым.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if os.getenv('YANOTE_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('YANOTE_CACHE_DIR'),
+    }
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Количество заметок на одной странице списка.
+NOTES_PAGE_SIZE = 50
+# Сколько заметок можно удалить или изменить одним запросом.
+NOTES_BULK_MAX = 500
+# Сколько заметок можно получить одним запросом API по списку slug.
+NOTES_API_BATCH_MAX = 100
+# На сколько секунд раньше времени ответа API списка его timestamp.
+# updated_at заметки ставится до коммита, и запись, которая дольше
+# шла до коммита, станет видна с updated_at раньше времени ответа.
+# Запас должен быть не меньше самой долгой транзакции записи заметок.
+NOTES_API_SINCE_MARGIN = 60
+# Сколько записей журнала изменений отдавать за один запрос ленты.
+NOTES_CHANGES_PAGE_SIZE = 200
+# Сколько дней хранить журнал изменений (команда compact_note_changes).
+NOTES_CHANGE_LOG_DAYS = 30
+
+# Замеры страниц заметок: заголовок Server-Timing, лог
+# notes.instrumentation и команда notes_timings. Выключенные замеры
+# ничего не стоят: middleware не попадает в цепочку обработки.
+NOTES_INSTRUMENTATION = os.getenv('YANOTE_INSTRUMENTATION') == '1'
+# Сколько последних замеров хранить для каждого представления.
+NOTES_INSTRUMENTATION_WINDOW = 1000
+# Как часто, в секундах, процесс сохраняет замеры в кэш.
+NOTES_INSTRUMENTATION_FLUSH = 10
+# Сколько секунд замеры завершившегося процесса остаются в кэше.
+NOTES_INSTRUMENTATION_TTL = 60 * 60
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'notes.instrumentation': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+# Тексты заметок от этого размера в байтах хранятся сжатыми zlib,
+# если так они занимают меньше места; 0 — не сжимать новые тексты.
+# Уже записанные тексты переводит команда compress_notes.
+NOTES_TEXT_COMPRESSION_MIN_BYTES = int(
+    os.getenv('YANOTE_TEXT_COMPRESSION_MIN_BYTES', 4096)
+)
+
+# Тексты заметок от этого размера в БД, в байтах, страница заметки
+# передаёт потоком, читая из БД частями по NOTES_STREAM_CHUNK_BYTES.
+NOTES_STREAM_MIN_BYTES = 256 * 1024
+NOTES_STREAM_CHUNK_BYTES = 64 * 1024
+
+# Сколько секунд хранить отрисованный список заметок. Список
+# сбрасывается при любом изменении заметок автора.
+NOTES_LIST_CACHE_TIMEOUT = 60 * 60
@@ -0,0 +1,52 @@
+"""Хранилище статики: имена с хешем содержимого и сжатые копии."""
+from pathlib import PurePosixPath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import available_encodings, compress
+
+# Текстовые форматы, которые имеет смысл сжимать.
+COMPRESSIBLE = {
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml',
+}
+
+# Расширения сжатых копий и максимальные уровни сжатия: файлы
+# сжимаются один раз при collectstatic.
+SUFFIXES = {'br': ('.br', 11), 'gzip': ('.gz', 9)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage, который после collectstatic кладёт
+    рядом с текстовыми файлами копии .gz и .br, если они меньше.
+
+    Пока collectstatic не запускали (разработка, тесты), адреса
+    статики строятся без хеша, как у обычного хранилища.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if PurePosixPath(name).suffix in COMPRESSIBLE:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        for encoding in available_encodings():
+            suffix, level = SUFFIXES[encoding]
+            compressed = compress(data, encoding, level)
+            if len(compressed) >= len(data):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
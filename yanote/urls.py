@@ -6,6 +6,10 @@ from django.views.generic import CreateView
 
 urlpatterns = [
     path('', include('notes.urls')),
+    # Те же страницы заметок в виде асинхронных представлений для ASGI.
+    path('async/', include('notes.async_urls')),
+    # JSON API заметок для клиентов синхронизации.
+    path('api/', include('notes.api_urls')),
     path('admin/', admin.site.urls),
 ]
 